@@ -0,0 +1,26 @@
+from typing import List, Sequence, Tuple
+
+from fastapi import HTTPException
+
+# Upper bounds on ids per batch lookup; long lists belong in the POST body
+MAX_QUERY_IDS = 200
+MAX_BODY_IDS = 1000
+
+IDS_DESCRIPTION = f"Comma-separated ids (at most {MAX_QUERY_IDS}); results keep this order"
+
+
+def parse_ids(ids: str) -> List[int]:
+    try:
+        values = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not values or len(values) > MAX_QUERY_IDS:
+        raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_QUERY_IDS} ids are allowed")
+    return values
+
+
+def fetch_by_ids(query, pk, ids: Sequence[int]) -> Tuple[list, List[int]]:
+    """Load rows for ``ids`` in one IN query; return them in request order plus the ids not found."""
+    wanted = list(dict.fromkeys(ids))
+    found = {getattr(row, pk.key): row for row in query.filter(pk.in_(wanted)).all()}
+    return [found[i] for i in wanted if i in found], [i for i in wanted if i not in found]
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query as OrmQuery
+
+from app.core.config import settings
+from app.models.models import TableVersion
+
+# (row count, latest createdDate/modifiedDate, version) summarising one table
+# or filtered query. Count and dates alone miss writes within the same clock
+# tick (or a long transaction committing after a shorter one); the version,
+# a TableVersion counter or a digest of in-memory rows, changes on every write.
+Validator = Tuple[int, Optional[datetime], Union[int, str, None]]
+
+
+def query_validator(query: OrmQuery, model) -> Validator:
+    """Summarise the rows matched by ``query`` with a single aggregate query."""
+    version = select(TableVersion.version).where(TableVersion.tableName == model.__tablename__).scalar_subquery()
+    count, latest, version = query.with_entities(
+        func.count(),
+        func.max(func.coalesce(model.modifiedDate, model.createdDate)),
+        version,
+    ).order_by(None).one()
+    return count, latest, version
+
+
+class ValidatorCache:
+    """Query validators kept until a change event for one of their entities.
+
+    Lets list GETs and their 304 revalidations skip the aggregate query.
+    Entries also expire after ``ttl_seconds``, which bounds how long a write
+    made by another worker goes unnoticed when no invalidation bus is set up.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Bumped on invalidation so a load that raced a write is not stored
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, entities: Sequence[str], loader: Callable[[], Validator]) -> Validator:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[2]
+            generations = [self._generations[entity] for entity in entities]
+
+        validator = loader()
+
+        with self._lock:
+            if [self._generations[entity] for entity in entities] == generations:
+                self._entries[key] = (now + self.ttl_seconds, tuple(entities), validator)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return validator
+
+    def invalidate(self, entity: str) -> None:
+        with self._lock:
+            self._generations[entity] += 1
+            for key in [key for key, entry in self._entries.items() if entity in entry[1]]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            for entity in self._generations:
+                self._generations[entity] += 1
+            self._entries.clear()
+
+
+def rows_validator(rows: Iterable) -> Validator:
+    """Summarise rows that are already in memory, such as cached master tables."""
+    rows = list(rows)
+    dates = [row.modifiedDate or row.createdDate for row in rows]
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(row.model_dump_json().encode("utf-8"))
+    return len(rows), max(dates) if dates else None, digest.hexdigest()
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" are the same validator for GET
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == opaque
+        for candidate in candidates
+    )
+
+
+def conditional_response(request: Request, response: Response, validators: List[Validator]) -> Optional[Response]:
+    """Set ETag/Last-Modified for a GET, or return a 304 if the client copy is current.
+
+    The ETag covers the path, the query parameters and every validator, so a
+    change in any table the payload is built from produces a new tag.
+    """
+    params = sorted(request.query_params.multi_items())
+    fingerprint = repr((
+        request.url.path, params,
+        [(count, latest and latest.isoformat(), version) for count, latest, version in validators],
+    ))
+    etag = 'W/"%s"' % hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+    headers = {"ETag": etag}
+    dates = [latest for _, latest, _ in validators if latest is not None]
+    if dates:
+        latest = max(dates)
+        if latest.tzinfo is None:
+            latest = latest.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(latest.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+validator_cache = ValidatorCache(
+    ttl_seconds=settings.VALIDATOR_CACHE_TTL_SECONDS,
+    max_entries=settings.VALIDATOR_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import joinedload, noload, selectinload
+
+from app.api.schemas import ProdComposition, ProdDetail
+from app.models.models import GenericMast, ProdGeneric, ProdMast
+
+# Relations nested in product responses; the first five are returned unless expand narrows them
+PRODUCT_RELATIONS = ("productType", "manufacturer", "purchaseTax", "saleTax", "scheduleType")
+PRODUCT_EXPANSIONS = PRODUCT_RELATIONS + ("generics",)
+EXPAND_DESCRIPTION = "Comma-separated relations to include: " + ", ".join(PRODUCT_EXPANSIONS)
+
+
+def parse_product_expand(expand: Optional[str]) -> set:
+    if expand is None:
+        return set(PRODUCT_RELATIONS)
+    relations = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = relations.difference(PRODUCT_EXPANSIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expand value(s): {', '.join(sorted(unknown))}")
+    return relations
+
+
+def product_load_options(relations: set) -> list:
+    # Eager-load what the response nests, suppress lazy loads of everything else
+    options = [
+        joinedload(getattr(ProdMast, name)) if name in relations else noload(getattr(ProdMast, name))
+        for name in PRODUCT_RELATIONS
+    ]
+    if "generics" in relations:
+        options.append(
+            selectinload(ProdMast.product_generics)
+            .joinedload(ProdGeneric.generic)
+            .joinedload(GenericMast.category)
+        )
+    return options
+
+
+def product_details(products: list, relations: set) -> List[ProdDetail]:
+    details = []
+    for product in products:
+        detail = ProdDetail.model_validate(product)
+        if "generics" in relations:
+            detail.generics = [ProdComposition.model_validate(mapping) for mapping in product.product_generics]
+        details.append(detail)
+    return details
@@ -0,0 +1,74 @@
+from typing import Dict, List, Mapping, Sequence
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.expand import PRODUCT_RELATIONS
+from app.api.schemas import Generic, Mfr, PaginationResponse, ProdDetail
+from app.models.models import MfrMast, ProdMast
+
+# Fast path for large lists (FAST_JSON_RESPONSES): column rows are shaped into
+# dicts in response-model field order and encoded by orjson without a second
+# validation pass, so the JSON matches the response model field for field.
+
+
+def _foreign_key(model, relation: str) -> str:
+    return next(iter(getattr(model, relation).property.local_columns)).key
+
+
+def shape(schema, row: Mapping) -> dict:
+    # Fields the row does not carry (nested relations) come out as null, like the model default
+    return {name: row.get(name) for name in schema.model_fields}
+
+
+def shape_page(page: dict) -> dict:
+    return {name: page.get(name) for name in PaginationResponse.model_fields}
+
+
+def response(content, response: Response) -> ORJSONResponse:
+    # A returned Response skips FastAPI's header merge, so carry ETag/Last-Modified over
+    return ORJSONResponse(content, headers=dict(response.headers))
+
+
+def _master_lookup(rows: Sequence, key: str) -> Dict[int, dict]:
+    return {getattr(row, key): row.model_dump() for row in rows}
+
+
+def product_items(db: Session, rows: Sequence, relations: set, masters: Dict[str, Sequence]) -> List[dict]:
+    """Shape product column rows as ProdDetail dicts with the requested relations.
+
+    ``masters`` holds the cached schema rows for every relation except the
+    manufacturer, which is read in one IN query for the manufacturers on the page.
+    """
+    items = [shape(ProdDetail, row._mapping) for row in rows]
+    # Compositions stay on the ORM path, and ProdDetail omits them when not requested
+    for item in items:
+        del item["generics"]
+    for relation in PRODUCT_RELATIONS:
+        if relation not in relations:
+            continue
+        key = _foreign_key(ProdMast, relation)
+        if relation == "manufacturer":
+            codes = {item[key] for item in items}
+            stmt = select(MfrMast.__table__).where(MfrMast.mfrCode.in_(codes))
+            lookup = {row["mfrCode"]: shape(Mfr, row) for row in db.execute(stmt).mappings()}
+        else:
+            target = getattr(ProdMast, relation).property.mapper.primary_key[0].key
+            lookup = _master_lookup(masters[relation], target)
+        for item in items:
+            item[relation] = lookup.get(item[key])
+    return items
+
+
+def generic_items(rows: Sequence, categories: Sequence) -> List[dict]:
+    lookup = _master_lookup(categories, "prodCatCode")
+    items = [shape(Generic, row._mapping) for row in rows]
+    for item in items:
+        item["category"] = lookup.get(item["prodCatCode"])
+    return items
+
+
+def flat_items(schema, rows: Sequence) -> List[dict]:
+    return [shape(schema, row._mapping) for row in rows]
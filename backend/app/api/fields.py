@@ -0,0 +1,42 @@
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.config import settings
+
+FIELDS_DESCRIPTION = "Comma-separated columns to return; only these are selected from the database"
+
+
+def parse_fields(fields: Optional[str], model) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    columns = model.__table__.columns.keys()
+    unknown = [name for name in names if name not in columns]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown) or '(none given)'}. Allowed: {', '.join(columns)}"
+        )
+    return names
+
+
+def project(query, model, names: Sequence[str], key_columns: Sequence = ()):
+    # Keyset columns are selected too so the next cursor can be built from the last row
+    selected = dict.fromkeys([*names, *(column.key for column in key_columns)])
+    return query.with_entities(*(getattr(model, name) for name in selected))
+
+
+def projected_items(rows: Sequence, names: Sequence[str]) -> List[dict]:
+    return [{name: getattr(row, name) for name in names} for row in rows]
+
+
+def projected_response(content, response: Optional[Response] = None) -> Response:
+    # Partial rows do not fit the declared response model, so they are encoded
+    # directly; a returned Response skips FastAPI's header merge, so copy the ETag over
+    headers = dict(response.headers) if response is not None else None
+    if settings.FAST_JSON_RESPONSES:
+        return ORJSONResponse(content, headers=headers)
+    return JSONResponse(jsonable_encoder(content), headers=headers)
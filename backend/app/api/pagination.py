@@ -0,0 +1,60 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, tuple_
+from sqlalchemy.orm import Query as OrmQuery
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _matches_column(value: Any, column) -> bool:
+    python_type = column.type.python_type
+    # bool is an int subclass, but never a valid integer key
+    if isinstance(value, bool) and python_type is not bool:
+        return False
+    if not isinstance(value, python_type):
+        return False
+    # Postgres rejects out-of-range integer parameters instead of comparing them
+    return type(column.type) is not Integer or -2**31 <= value < 2**31
+
+
+def keyset_page(query: OrmQuery, key_columns: Sequence, cursor: str, limit: int) -> dict:
+    """Return one page of ``query`` ordered by ``key_columns``, seeking past ``cursor``.
+
+    An empty cursor starts from the first row. The last key column must be
+    unique (the primary key) so the ordering is total.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(key_columns))
+        if not all(map(_matches_column, values, key_columns)):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if len(key_columns) == 1:
+            query = query.filter(key_columns[0] > values[0])
+        else:
+            query = query.filter(tuple_(*key_columns) > tuple_(*values))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(*key_columns).limit(limit + 1).all()
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key_columns])
+
+    return {"page_size": limit, "next_cursor": next_cursor, "items": rows}
@@ -1,49 +1,321 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.models.models import ProdMast, ProdTypeMast, ProdCatMast, MfrMast, SchTypeMast, GenericMast, TaxMast, ProdGeneric
+from typing import List, Literal, Optional, Sequence, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from app.core.cache import master_cache
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, get_db, get_read_db
+from app.models.models import ProdMast, ProdTypeMast, ProdCatMast, MfrMast, SchTypeMast, GenericMast, TaxMast, ProdGeneric, ProdCatalog
+from app.api.expand import (
+    EXPAND_DESCRIPTION, PRODUCT_RELATIONS, parse_product_expand, product_details, product_load_options
+)
+from app.api import fast_json
+from app.api.batch import IDS_DESCRIPTION, fetch_by_ids, parse_ids
+from app.api.fields import FIELDS_DESCRIPTION, parse_fields, project, projected_items, projected_response
+from app.api.conditional import Validator, conditional_response, query_validator, rows_validator, validator_cache
+from app.api.pagination import keyset_page
+from app.services.product_export import iter_products_csv, iter_products_ndjson
+from app.services.product_import import import_products, parse_csv
+from app.services.composition_index import composition_index
+from app.services.search_index import product_search_index
+from app.services import catalog, events, fulltext
+from app.services.pricing import compute_lines, tax_rates
+from app.services.product_snapshot import product_snapshot
+from app.services.product_generics import replace_compositions
+from app.services.sync import SYNC_BATCH_SIZE, changes_since, record_deletions
+from app.services.unit_of_work import run_batch
 from app.api.schemas import (
-    Prod, ProdCreate, ProdUpdate,
+    PaginationResponse, BatchIds, BatchResponse, SearchHit, PosProduct,
+    Prod, ProdCreate, ProdUpdate, ProdDetail, ProdCatalogEntry, ProdSearchHit, BulkImportResult, SyncResponse, PricingRequest, PricingResult,
     ProdType, ProdTypeCreate, ProdTypeUpdate,
     ProdCat, ProdCatCreate, ProdCatUpdate,
     Mfr, MfrCreate, MfrUpdate,
     SchType, SchTypeCreate, SchTypeUpdate,
     Generic, GenericCreate, GenericUpdate,
     Tax, TaxCreate, TaxUpdate,
-    ProdGeneric as ProdGenericSchema, ProdGenericCreate, ProdGenericUpdate
+    ProdGeneric as ProdGenericSchema, ProdGenericCreate, ProdGenericUpdate,
+    CompositionReplace, CompositionBulkReplace, CompositionReplaceResult,
+    BatchRequest, BatchResult
 )
 
 router = APIRouter()
 
+CURSOR_DESCRIPTION = "Opaque keyset cursor. Pass an empty value for the first page, then the returned next_cursor; skip is ignored."
+
+
+def _cached_master(db: Session, key: str, model, schema, pk) -> list:
+    # Full, validated row list of a small master table; a cache hit never touches the pool
+    def load():
+        # The cache is shared by every client, so never fill it from a lagging replica
+        if db.get_bind() is engine:
+            return [schema.model_validate(row) for row in db.query(model).order_by(pk).all()]
+        with SessionLocal() as primary:
+            return [schema.model_validate(row) for row in primary.query(model).order_by(pk).all()]
+    return master_cache.get_or_load(key, load)
+
+
+# Cached tables are dropped when their entity changes, in this or any other worker
+MASTER_CACHE_KEYS = {
+    "product_type": "product_types",
+    "product_category": "product_categories",
+    "tax": "taxes",
+    "schedule_type": "schedule_types",
+}
+for _entity, _key in MASTER_CACHE_KEYS.items():
+    events.subscribe(_entity, lambda ids, key=_key: master_cache.invalidate(key))
+
+# List validators are dropped with the entities they summarise
+for _entity in ("product", "product_composition", "manufacturer", "generic"):
+    events.subscribe(_entity, lambda ids, entity=_entity: validator_cache.invalidate(entity))
+
+
+def _cached_validator(db: Session, key: tuple, entities: Sequence[str], query, model) -> Validator:
+    # Shared by every client, so like the master cache never filled from a lagging replica
+    def load():
+        if db.get_bind() is engine:
+            return query_validator(query, model)
+        with SessionLocal() as primary:
+            return query_validator(query.with_session(primary), model)
+    return validator_cache.get_or_load(key, entities, load)
+
+
+def _cached_master_row(db: Session, key: str, model, schema, pk, code: int):
+    return next((row for row in _cached_master(db, key, model, schema, pk) if getattr(row, pk.key) == code), None)
+
+
+def _product_generic_validators(db: Session, products_query, key: Optional[tuple] = None) -> list:
+    # List queries pass a cache key; single-product lookups are cheap enough to run
+    mappings = db.query(ProdGeneric).filter(ProdGeneric.prodCode.in_(products_query.with_entities(ProdMast.prodCode)))
+    if key is None:
+        mappings_validator = query_validator(mappings, ProdGeneric)
+    else:
+        mappings_validator = _cached_validator(db, ("product_generics", *key), ("product", "product_composition"), mappings, ProdGeneric)
+    return [
+        mappings_validator,
+        _cached_validator(db, ("generics",), ("generic",), db.query(GenericMast), GenericMast),
+        *_generic_relation_validators(db),
+    ]
+
+
+def _product_relation_validators(db: Session) -> list:
+    # Product payloads nest their type, manufacturer, taxes and schedule
+    return [
+        _cached_validator(db, ("manufacturers",), ("manufacturer",), db.query(MfrMast), MfrMast),
+        rows_validator(_cached_master(db, "product_types", ProdTypeMast, ProdType, ProdTypeMast.prodTypeCode)),
+        rows_validator(_cached_master(db, "taxes", TaxMast, Tax, TaxMast.taxCode)),
+        rows_validator(_cached_master(db, "schedule_types", SchTypeMast, SchType, SchTypeMast.schTypeCode)),
+    ]
+
+
+def _product_relations(expand: Optional[str], fields: Optional[str]) -> set:
+    # Projected responses are flat column subsets with nothing nested
+    if fields is not None:
+        if expand is not None:
+            raise HTTPException(status_code=400, detail="fields and expand cannot be combined")
+        return set()
+    return parse_product_expand(expand)
+
+
+def _product_masters(db: Session) -> dict:
+    # Cached rows behind each product relation except the manufacturer
+    taxes = _cached_master(db, "taxes", TaxMast, Tax, TaxMast.taxCode)
+    return {
+        "productType": _cached_master(db, "product_types", ProdTypeMast, ProdType, ProdTypeMast.prodTypeCode),
+        "purchaseTax": taxes,
+        "saleTax": taxes,
+        "scheduleType": _cached_master(db, "schedule_types", SchTypeMast, SchType, SchTypeMast.schTypeCode),
+    }
+
+
+def _generic_relation_validators(db: Session) -> list:
+    # Generic payloads nest their category
+    return [rows_validator(_cached_master(db, "product_categories", ProdCatMast, ProdCat, ProdCatMast.prodCatCode))]
+
+
 # Product Routes
-@router.get("/products", response_model=List[Prod])
+@router.get("/products", response_model=Union[List[ProdDetail], PaginationResponse[ProdDetail]])
 def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    sort: Optional[Literal["prodName"]] = Query(None, description="Cursor mode only: order by product name instead of code"),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
+    relations = _product_relations(expand, fields)
+    field_names = parse_fields(fields, ProdMast)
     query = db.query(ProdMast)
     if is_active is not None:
         query = query.filter(ProdMast.isActive == is_active)
+    validators = [
+        _cached_validator(db, ("products", is_active), ("product",), query, ProdMast),
+        *_product_relation_validators(db),
+    ]
+    if "generics" in relations:
+        validators += _product_generic_validators(db, query, key=("products", is_active))
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    key_columns = [ProdMast.prodName, ProdMast.prodCode] if sort == "prodName" else [ProdMast.prodCode]
+    if field_names is not None:
+        query = project(query, ProdMast, field_names, key_columns)
+        if cursor is not None:
+            page = keyset_page(query, key_columns, cursor, limit)
+            page["items"] = projected_items(page["items"], field_names)
+            return projected_response(fast_json.shape_page(page), response)
+        return projected_response(projected_items(query.offset(skip).limit(limit).all(), field_names), response)
+    if settings.FAST_JSON_RESPONSES and "generics" not in relations:
+        # Compositions are nested collections and stay on the ORM path
+        masters = _product_masters(db)
+        query = query.with_entities(*ProdMast.__table__.columns)
+        if cursor is not None:
+            page = keyset_page(query, key_columns, cursor, limit)
+            page["items"] = fast_json.product_items(db, page["items"], relations, masters)
+            return fast_json.response(fast_json.shape_page(page), response)
+        rows = query.offset(skip).limit(limit).all()
+        return fast_json.response(fast_json.product_items(db, rows, relations, masters), response)
+    query = query.options(*product_load_options(relations))
+    if cursor is not None:
+        page = keyset_page(query, key_columns, cursor, limit)
+        page["items"] = product_details(page["items"], relations)
+        return page
     products = query.offset(skip).limit(limit).all()
-    return products
+    return product_details(products, relations)
+
+def _products_by_ids(db: Session, ids: List[int], expand: Optional[str]) -> dict:
+    relations = parse_product_expand(expand)
+    query = db.query(ProdMast).options(*product_load_options(relations))
+    products, missing = fetch_by_ids(query, ProdMast.prodCode, ids)
+    return {"items": product_details(products, relations), "missing": missing}
+
+@router.get("/products:batch", response_model=BatchResponse[ProdDetail])
+def get_products_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    return _products_by_ids(db, parse_ids(ids), expand)
+
+@router.post("/products:batch", response_model=BatchResponse[ProdDetail])
+def post_products_batch(
+    request: BatchIds,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    return _products_by_ids(db, request.ids, expand)
 
 @router.post("/products", response_model=Prod)
 def create_product(product: ProdCreate, db: Session = Depends(get_db)):
     db_product = ProdMast(**product.dict())
     db.add(db_product)
+    db.flush()
+    catalog.refresh_products(db, [db_product.prodCode])
     db.commit()
     db.refresh(db_product)
+    events.publish("product", [db_product.prodCode])
     return db_product
 
-@router.get("/products/{product_id}", response_model=Prod)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(ProdMast).filter(ProdMast.prodCode == product_id).first()
-    if not product:
+def _parse_csv_upload(data: bytes) -> List[dict]:
+    try:
+        return parse_csv(data.decode("utf-8-sig"))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+
+@router.post("/products/bulk", response_model=BulkImportResult)
+async def bulk_import_products(request: Request, db: Session = Depends(get_db)):
+    # Accepts a JSON array, a raw text/csv body or a multipart upload in field "file"
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV file in form field 'file'")
+        rows = _parse_csv_upload(await upload.read())
+    elif content_type.startswith("text/csv"):
+        rows = _parse_csv_upload(await request.body())
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of products")
+
+    # The import is blocking database work, keep it off the event loop
+    result = await run_in_threadpool(import_products, db, rows)
+    if result["inserted"] or result["updated"]:
+        await run_in_threadpool(events.publish, "product")
+    return result
+
+@router.get("/products/search", response_model=List[ProdSearchHit])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    active_only: bool = True
+):
+    return [hit._asdict() for hit in product_search_index.search(q, limit=limit, active_only=active_only)]
+
+@router.get("/products/export")
+def export_products(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    is_active: Optional[bool] = None,
+    db: Session = Depends(get_read_db)
+):
+    if format == "csv":
+        content, media_type = iter_products_csv(db, is_active), "text/csv"
+    else:
+        content, media_type = iter_products_ndjson(db, is_active), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+    )
+
+@router.get("/products/{product_id}", response_model=ProdDetail)
+def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    relations = _product_relations(expand, fields)
+    field_names = parse_fields(fields, ProdMast)
+    query = db.query(ProdMast).filter(ProdMast.prodCode == product_id)
+    validator = query_validator(query, ProdMast)
+    if not validator[0]:
+        raise HTTPException(status_code=404, detail="Product not found")
+    validators = [validator, *_product_relation_validators(db)]
+    if "generics" in relations:
+        validators += _product_generic_validators(db, query)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    if field_names is not None:
+        return projected_response(projected_items([project(query, ProdMast, field_names).first()], field_names)[0], response)
+    return product_details([query.options(*product_load_options(relations)).first()], relations)[0]
+
+@router.get("/products/{product_id}/substitutes", response_model=List[Prod])
+def get_product_substitutes(
+    product_id: int,
+    active_only: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    if not db.query(ProdMast.prodCode).filter(ProdMast.prodCode == product_id).first():
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    prod_codes = composition_index.substitutes(product_id)
+    if not prod_codes:
+        return []
+    query = db.query(ProdMast).options(*product_load_options(set(PRODUCT_RELATIONS))).filter(ProdMast.prodCode.in_(prod_codes))
+    if active_only:
+        query = query.filter(ProdMast.isActive == True)
+    return query.order_by(ProdMast.mrp, ProdMast.prodCode).all()
 
 @router.put("/products/{product_id}", response_model=Prod)
 def update_product(product_id: int, product: ProdUpdate, db: Session = Depends(get_db)):
@@ -55,8 +327,10 @@ def update_product(product_id: int, product: ProdUpdate, db: Session = Depends(g
     for field, value in update_data.items():
         setattr(db_product, field, value)
     
+    catalog.refresh_products(db, [product_id])
     db.commit()
     db.refresh(db_product)
+    events.publish("product", [product_id])
     return db_product
 
 @router.delete("/products/{product_id}")
@@ -65,19 +339,91 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     db.delete(product)
+    record_deletions(db, ProdMast, [product_id])
+    catalog.refresh_products(db, [product_id])
     db.commit()
+    events.publish("product", [product_id])
     return {"message": "Product deleted successfully"}
 
 
+# Full-text Search Routes
+@router.get("/search", response_model=PaginationResponse[SearchHit])
+def search_all(
+    q: str = Query(..., min_length=1, max_length=100, description="Words to match as prefixes, e.g. \"paracetamol 500\""),
+    entity: Optional[Literal["product", "generic", "manufacturer"]] = None,
+    active_only: bool = True,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    total, hits = fulltext.search(db, q, entity=entity, active_only=active_only, skip=skip, limit=limit)
+    return {
+        "total": total,
+        "page": skip // limit + 1,
+        "page_size": limit,
+        "total_pages": (total + limit - 1) // limit,
+        "items": hits,
+    }
+
+
+# Catalog Routes
+@router.get("/catalog", response_model=Union[List[ProdCatalogEntry], PaginationResponse[ProdCatalogEntry]])
+def get_catalog(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    is_active: Optional[bool] = None,
+    mfr_code: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    sort: Optional[Literal["prodName"]] = Query(None, description="Cursor mode only: order by product name instead of code"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    field_names = parse_fields(fields, ProdCatalog)
+    query = db.query(ProdCatalog)
+    if is_active is not None:
+        query = query.filter(ProdCatalog.isActive == is_active)
+    if mfr_code is not None:
+        query = query.filter(ProdCatalog.mfrCode == mfr_code)
+    key_columns = [ProdCatalog.prodName, ProdCatalog.prodCode] if sort == "prodName" else [ProdCatalog.prodCode]
+    if field_names is not None:
+        query = project(query, ProdCatalog, field_names, key_columns)
+        if cursor is not None:
+            page = keyset_page(query, key_columns, cursor, limit)
+            page["items"] = projected_items(page["items"], field_names)
+            return projected_response(fast_json.shape_page(page))
+        rows = query.order_by(ProdCatalog.prodCode).offset(skip).limit(limit).all()
+        return projected_response(projected_items(rows, field_names))
+    if cursor is not None:
+        return keyset_page(query, key_columns, cursor, limit)
+    return query.order_by(ProdCatalog.prodCode).offset(skip).limit(limit).all()
+
+@router.post("/catalog/rebuild")
+def rebuild_catalog(db: Session = Depends(get_db)):
+    # Only needed after writes that bypass the API, such as direct SQL loads
+    rows = catalog.rebuild(db)
+    db.commit()
+    # The same writes were never published, so drop everything derived from products
+    events.publish("product")
+    return {"rows": rows}
+
+
 # Product Type Routes
-@router.get("/product-types", response_model=List[ProdType])
+@router.get("/product-types", response_model=Union[List[ProdType], PaginationResponse[ProdType]])
 def get_product_types(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
-    product_types = db.query(ProdTypeMast).offset(skip).limit(limit).all()
-    return product_types
+    if cursor is not None:
+        return keyset_page(db.query(ProdTypeMast), [ProdTypeMast.prodTypeCode], cursor, limit)
+    product_types = _cached_master(db, "product_types", ProdTypeMast, ProdType, ProdTypeMast.prodTypeCode)
+    not_modified = conditional_response(request, response, [rows_validator(product_types)])
+    if not_modified:
+        return not_modified
+    return product_types[skip:skip + limit]
 
 @router.post("/product-types", response_model=ProdType)
 def create_product_type(product_type: ProdTypeCreate, db: Session = Depends(get_db)):
@@ -85,13 +431,17 @@ def create_product_type(product_type: ProdTypeCreate, db: Session = Depends(get_
     db.add(db_product_type)
     db.commit()
     db.refresh(db_product_type)
+    events.publish("product_type", [db_product_type.prodTypeCode])
     return db_product_type
 
 @router.get("/product-types/{type_id}", response_model=ProdType)
-def get_product_type(type_id: int, db: Session = Depends(get_db)):
-    product_type = db.query(ProdTypeMast).filter(ProdTypeMast.prodTypeCode == type_id).first()
+def get_product_type(type_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    product_type = _cached_master_row(db, "product_types", ProdTypeMast, ProdType, ProdTypeMast.prodTypeCode, type_id)
     if not product_type:
         raise HTTPException(status_code=404, detail="Product type not found")
+    not_modified = conditional_response(request, response, [rows_validator([product_type])])
+    if not_modified:
+        return not_modified
     return product_type
 
 @router.put("/product-types/{type_id}", response_model=ProdType)
@@ -104,20 +454,30 @@ def update_product_type(type_id: int, product_type: ProdTypeUpdate, db: Session
     for field, value in update_data.items():
         setattr(db_product_type, field, value)
     
+    catalog.refresh_master(db, ProdTypeMast, type_id)
     db.commit()
     db.refresh(db_product_type)
+    events.publish("product_type", [type_id])
     return db_product_type
 
 
 # Product Category Routes
-@router.get("/product-categories", response_model=List[ProdCat])
+@router.get("/product-categories", response_model=Union[List[ProdCat], PaginationResponse[ProdCat]])
 def get_product_categories(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
-    categories = db.query(ProdCatMast).offset(skip).limit(limit).all()
-    return categories
+    if cursor is not None:
+        return keyset_page(db.query(ProdCatMast), [ProdCatMast.prodCatCode], cursor, limit)
+    categories = _cached_master(db, "product_categories", ProdCatMast, ProdCat, ProdCatMast.prodCatCode)
+    not_modified = conditional_response(request, response, [rows_validator(categories)])
+    if not_modified:
+        return not_modified
+    return categories[skip:skip + limit]
 
 @router.post("/product-categories", response_model=ProdCat)
 def create_product_category(category: ProdCatCreate, db: Session = Depends(get_db)):
@@ -125,13 +485,17 @@ def create_product_category(category: ProdCatCreate, db: Session = Depends(get_d
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    events.publish("product_category", [db_category.prodCatCode])
     return db_category
 
 @router.get("/product-categories/{category_id}", response_model=ProdCat)
-def get_product_category(category_id: int, db: Session = Depends(get_db)):
-    category = db.query(ProdCatMast).filter(ProdCatMast.prodCatCode == category_id).first()
+def get_product_category(category_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    category = _cached_master_row(db, "product_categories", ProdCatMast, ProdCat, ProdCatMast.prodCatCode, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Product category not found")
+    not_modified = conditional_response(request, response, [rows_validator([category])])
+    if not_modified:
+        return not_modified
     return category
 
 @router.put("/product-categories/{category_id}", response_model=ProdCat)
@@ -146,33 +510,88 @@ def update_product_category(category_id: int, category: ProdCatUpdate, db: Sessi
     
     db.commit()
     db.refresh(db_category)
+    events.publish("product_category", [category_id])
     return db_category
 
 
 # Manufacturer Routes
-@router.get("/manufacturers", response_model=List[Mfr])
+@router.get("/manufacturers", response_model=Union[List[Mfr], PaginationResponse[Mfr]])
 def get_manufacturers(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
+    field_names = parse_fields(fields, MfrMast)
+    not_modified = conditional_response(request, response, [
+        _cached_validator(db, ("manufacturers",), ("manufacturer",), db.query(MfrMast), MfrMast)
+    ])
+    if not_modified:
+        return not_modified
+    if field_names is not None:
+        query = project(db.query(MfrMast), MfrMast, field_names, [MfrMast.mfrCode])
+        if cursor is not None:
+            page = keyset_page(query, [MfrMast.mfrCode], cursor, limit)
+            page["items"] = projected_items(page["items"], field_names)
+            return projected_response(fast_json.shape_page(page), response)
+        return projected_response(projected_items(query.offset(skip).limit(limit).all(), field_names), response)
+    if settings.FAST_JSON_RESPONSES:
+        query = db.query(MfrMast).with_entities(*MfrMast.__table__.columns)
+        if cursor is not None:
+            page = keyset_page(query, [MfrMast.mfrCode], cursor, limit)
+            page["items"] = fast_json.flat_items(Mfr, page["items"])
+            return fast_json.response(fast_json.shape_page(page), response)
+        return fast_json.response(fast_json.flat_items(Mfr, query.offset(skip).limit(limit).all()), response)
+    if cursor is not None:
+        return keyset_page(db.query(MfrMast), [MfrMast.mfrCode], cursor, limit)
     manufacturers = db.query(MfrMast).offset(skip).limit(limit).all()
     return manufacturers
 
+def _manufacturers_by_ids(db: Session, ids: List[int]) -> dict:
+    manufacturers, missing = fetch_by_ids(db.query(MfrMast), MfrMast.mfrCode, ids)
+    return {"items": manufacturers, "missing": missing}
+
+@router.get("/manufacturers:batch", response_model=BatchResponse[Mfr])
+def get_manufacturers_batch(ids: str = Query(..., description=IDS_DESCRIPTION), db: Session = Depends(get_read_db)):
+    return _manufacturers_by_ids(db, parse_ids(ids))
+
+@router.post("/manufacturers:batch", response_model=BatchResponse[Mfr])
+def post_manufacturers_batch(request: BatchIds, db: Session = Depends(get_read_db)):
+    return _manufacturers_by_ids(db, request.ids)
+
 @router.post("/manufacturers", response_model=Mfr)
 def create_manufacturer(manufacturer: MfrCreate, db: Session = Depends(get_db)):
     db_manufacturer = MfrMast(**manufacturer.dict())
     db.add(db_manufacturer)
+    db.flush()
+    catalog.refresh_master(db, MfrMast, db_manufacturer.mfrCode)
     db.commit()
     db.refresh(db_manufacturer)
+    events.publish("manufacturer", [db_manufacturer.mfrCode])
     return db_manufacturer
 
 @router.get("/manufacturers/{mfr_id}", response_model=Mfr)
-def get_manufacturer(mfr_id: int, db: Session = Depends(get_db)):
-    manufacturer = db.query(MfrMast).filter(MfrMast.mfrCode == mfr_id).first()
-    if not manufacturer:
+def get_manufacturer(
+    mfr_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    field_names = parse_fields(fields, MfrMast)
+    query = db.query(MfrMast).filter(MfrMast.mfrCode == mfr_id)
+    validator = query_validator(query, MfrMast)
+    if not validator[0]:
         raise HTTPException(status_code=404, detail="Manufacturer not found")
-    return manufacturer
+    not_modified = conditional_response(request, response, [validator])
+    if not_modified:
+        return not_modified
+    if field_names is not None:
+        return projected_response(projected_items([project(query, MfrMast, field_names).first()], field_names)[0], response)
+    return query.first()
 
 @router.put("/manufacturers/{mfr_id}", response_model=Mfr)
 def update_manufacturer(mfr_id: int, manufacturer: MfrUpdate, db: Session = Depends(get_db)):
@@ -184,20 +603,30 @@ def update_manufacturer(mfr_id: int, manufacturer: MfrUpdate, db: Session = Depe
     for field, value in update_data.items():
         setattr(db_manufacturer, field, value)
     
+    catalog.refresh_master(db, MfrMast, mfr_id)
     db.commit()
     db.refresh(db_manufacturer)
+    events.publish("manufacturer", [mfr_id])
     return db_manufacturer
 
 
 # Tax Routes
-@router.get("/taxes", response_model=List[Tax])
+@router.get("/taxes", response_model=Union[List[Tax], PaginationResponse[Tax]])
 def get_taxes(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
-    taxes = db.query(TaxMast).offset(skip).limit(limit).all()
-    return taxes
+    if cursor is not None:
+        return keyset_page(db.query(TaxMast), [TaxMast.taxCode], cursor, limit)
+    taxes = _cached_master(db, "taxes", TaxMast, Tax, TaxMast.taxCode)
+    not_modified = conditional_response(request, response, [rows_validator(taxes)])
+    if not_modified:
+        return not_modified
+    return taxes[skip:skip + limit]
 
 @router.post("/taxes", response_model=Tax)
 def create_tax(tax: TaxCreate, db: Session = Depends(get_db)):
@@ -205,13 +634,17 @@ def create_tax(tax: TaxCreate, db: Session = Depends(get_db)):
     db.add(db_tax)
     db.commit()
     db.refresh(db_tax)
+    events.publish("tax", [db_tax.taxCode])
     return db_tax
 
 @router.get("/taxes/{tax_id}", response_model=Tax)
-def get_tax(tax_id: int, db: Session = Depends(get_db)):
-    tax = db.query(TaxMast).filter(TaxMast.taxCode == tax_id).first()
+def get_tax(tax_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    tax = _cached_master_row(db, "taxes", TaxMast, Tax, TaxMast.taxCode, tax_id)
     if not tax:
         raise HTTPException(status_code=404, detail="Tax not found")
+    not_modified = conditional_response(request, response, [rows_validator([tax])])
+    if not_modified:
+        return not_modified
     return tax
 
 @router.put("/taxes/{tax_id}", response_model=Tax)
@@ -224,20 +657,30 @@ def update_tax(tax_id: int, tax: TaxUpdate, db: Session = Depends(get_db)):
     for field, value in update_data.items():
         setattr(db_tax, field, value)
     
+    catalog.refresh_master(db, TaxMast, tax_id)
     db.commit()
     db.refresh(db_tax)
+    events.publish("tax", [db_tax.taxCode])
     return db_tax
 
 
 # Schedule Type Routes
-@router.get("/schedule-types", response_model=List[SchType])
+@router.get("/schedule-types", response_model=Union[List[SchType], PaginationResponse[SchType]])
 def get_schedule_types(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
-    schedule_types = db.query(SchTypeMast).offset(skip).limit(limit).all()
-    return schedule_types
+    if cursor is not None:
+        return keyset_page(db.query(SchTypeMast), [SchTypeMast.schTypeCode], cursor, limit)
+    schedule_types = _cached_master(db, "schedule_types", SchTypeMast, SchType, SchTypeMast.schTypeCode)
+    not_modified = conditional_response(request, response, [rows_validator(schedule_types)])
+    if not_modified:
+        return not_modified
+    return schedule_types[skip:skip + limit]
 
 @router.post("/schedule-types", response_model=SchType)
 def create_schedule_type(schedule_type: SchTypeCreate, db: Session = Depends(get_db)):
@@ -245,44 +688,107 @@ def create_schedule_type(schedule_type: SchTypeCreate, db: Session = Depends(get
     db.add(db_schedule_type)
     db.commit()
     db.refresh(db_schedule_type)
+    events.publish("schedule_type", [db_schedule_type.schTypeCode])
     return db_schedule_type
 
 @router.get("/schedule-types/{schedule_id}", response_model=SchType)
-def get_schedule_type(schedule_id: int, db: Session = Depends(get_db)):
-    schedule_type = db.query(SchTypeMast).filter(SchTypeMast.schTypeCode == schedule_id).first()
+def get_schedule_type(schedule_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    schedule_type = _cached_master_row(db, "schedule_types", SchTypeMast, SchType, SchTypeMast.schTypeCode, schedule_id)
     if not schedule_type:
         raise HTTPException(status_code=404, detail="Schedule type not found")
+    not_modified = conditional_response(request, response, [rows_validator([schedule_type])])
+    if not_modified:
+        return not_modified
     return schedule_type
 
 
 # Generic Routes
-@router.get("/generics", response_model=List[Generic])
+@router.get("/generics", response_model=Union[List[Generic], PaginationResponse[Generic]])
 def get_generics(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     category_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
+    field_names = parse_fields(fields, GenericMast)
     query = db.query(GenericMast)
     if category_id:
         query = query.filter(GenericMast.prodCatCode == category_id)
+    not_modified = conditional_response(
+        request, response, [
+            _cached_validator(db, ("generics", category_id or None), ("generic",), query, GenericMast),
+            *_generic_relation_validators(db),
+        ]
+    )
+    if not_modified:
+        return not_modified
+    if field_names is not None:
+        query = project(query, GenericMast, field_names, [GenericMast.genericCode])
+        if cursor is not None:
+            page = keyset_page(query, [GenericMast.genericCode], cursor, limit)
+            page["items"] = projected_items(page["items"], field_names)
+            return projected_response(fast_json.shape_page(page), response)
+        return projected_response(projected_items(query.offset(skip).limit(limit).all(), field_names), response)
+    if settings.FAST_JSON_RESPONSES:
+        categories = _cached_master(db, "product_categories", ProdCatMast, ProdCat, ProdCatMast.prodCatCode)
+        query = query.with_entities(*GenericMast.__table__.columns)
+        if cursor is not None:
+            page = keyset_page(query, [GenericMast.genericCode], cursor, limit)
+            page["items"] = fast_json.generic_items(page["items"], categories)
+            return fast_json.response(fast_json.shape_page(page), response)
+        return fast_json.response(fast_json.generic_items(query.offset(skip).limit(limit).all(), categories), response)
+    if cursor is not None:
+        return keyset_page(query, [GenericMast.genericCode], cursor, limit)
     generics = query.offset(skip).limit(limit).all()
     return generics
 
+def _generics_by_ids(db: Session, ids: List[int]) -> dict:
+    query = db.query(GenericMast).options(joinedload(GenericMast.category))
+    generics, missing = fetch_by_ids(query, GenericMast.genericCode, ids)
+    return {"items": generics, "missing": missing}
+
+@router.get("/generics:batch", response_model=BatchResponse[Generic])
+def get_generics_batch(ids: str = Query(..., description=IDS_DESCRIPTION), db: Session = Depends(get_read_db)):
+    return _generics_by_ids(db, parse_ids(ids))
+
+@router.post("/generics:batch", response_model=BatchResponse[Generic])
+def post_generics_batch(request: BatchIds, db: Session = Depends(get_read_db)):
+    return _generics_by_ids(db, request.ids)
+
 @router.post("/generics", response_model=Generic)
 def create_generic(generic: GenericCreate, db: Session = Depends(get_db)):
     db_generic = GenericMast(**generic.dict())
     db.add(db_generic)
+    db.flush()
+    catalog.refresh_master(db, GenericMast, db_generic.genericCode)
     db.commit()
     db.refresh(db_generic)
+    events.publish("generic", [db_generic.genericCode])
     return db_generic
 
 @router.get("/generics/{generic_id}", response_model=Generic)
-def get_generic(generic_id: int, db: Session = Depends(get_db)):
-    generic = db.query(GenericMast).filter(GenericMast.genericCode == generic_id).first()
-    if not generic:
+def get_generic(
+    generic_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
+):
+    field_names = parse_fields(fields, GenericMast)
+    query = db.query(GenericMast).filter(GenericMast.genericCode == generic_id)
+    validator = query_validator(query, GenericMast)
+    if not validator[0]:
         raise HTTPException(status_code=404, detail="Generic not found")
-    return generic
+    not_modified = conditional_response(request, response, [validator, *_generic_relation_validators(db)])
+    if not_modified:
+        return not_modified
+    if field_names is not None:
+        return projected_response(projected_items([project(query, GenericMast, field_names).first()], field_names)[0], response)
+    return query.first()
 
 @router.put("/generics/{generic_id}", response_model=Generic)
 def update_generic(generic_id: int, generic: GenericUpdate, db: Session = Depends(get_db)):
@@ -294,25 +800,45 @@ def update_generic(generic_id: int, generic: GenericUpdate, db: Session = Depend
     for field, value in update_data.items():
         setattr(db_generic, field, value)
     
+    catalog.refresh_master(db, GenericMast, generic_id)
     db.commit()
     db.refresh(db_generic)
+    events.publish("generic", [generic_id])
     return db_generic
 
 
 # Product Generic Mapping Routes
-@router.get("/product-generics", response_model=List[ProdGenericSchema])
+@router.get("/product-generics", response_model=Union[List[ProdGenericSchema], PaginationResponse[ProdGenericSchema]])
 def get_product_generics(
+    request: Request,
+    response: Response,
     product_id: Optional[int] = None,
     generic_id: Optional[int] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
     query = db.query(ProdGeneric)
     if product_id:
         query = query.filter(ProdGeneric.prodCode == product_id)
     if generic_id:
         query = query.filter(ProdGeneric.genericCode == generic_id)
+    # Mappings nest the full product and generic, so their tables count too.
+    # Generics are a small master: the whole-table validator product payloads use covers them.
+    mapped_products = db.query(ProdMast).filter(ProdMast.prodCode.in_(query.with_entities(ProdGeneric.prodCode)))
+    key = (product_id or None, generic_id or None)
+    not_modified = conditional_response(request, response, [
+        _cached_validator(db, ("mappings", *key), ("product_composition",), query, ProdGeneric),
+        _cached_validator(db, ("mapped_products", *key), ("product", "product_composition"), mapped_products, ProdMast),
+        _cached_validator(db, ("generics",), ("generic",), db.query(GenericMast), GenericMast),
+        *_product_relation_validators(db),
+        *_generic_relation_validators(db),
+    ])
+    if not_modified:
+        return not_modified
+    if cursor is not None:
+        return keyset_page(query, [ProdGeneric.id], cursor, limit)
     mappings = query.offset(skip).limit(limit).all()
     return mappings
 
@@ -329,8 +855,10 @@ def create_product_generic_mapping(mapping: ProdGenericCreate, db: Session = Dep
     
     db_mapping = ProdGeneric(**mapping.dict())
     db.add(db_mapping)
+    catalog.refresh_products(db, [db_mapping.prodCode])
     db.commit()
     db.refresh(db_mapping)
+    events.publish("product_composition", [db_mapping.prodCode])
     return db_mapping
 
 @router.delete("/product-generics/{mapping_id}")
@@ -338,6 +866,97 @@ def delete_product_generic_mapping(mapping_id: int, db: Session = Depends(get_db
     mapping = db.query(ProdGeneric).filter(ProdGeneric.id == mapping_id).first()
     if not mapping:
         raise HTTPException(status_code=404, detail="Product-generic mapping not found")
+    prod_code = mapping.prodCode
     db.delete(mapping)
+    record_deletions(db, ProdGeneric, [mapping_id])
+    catalog.refresh_products(db, [prod_code])
     db.commit()
+    events.publish("product_composition", [prod_code])
     return {"message": "Product-generic mapping deleted successfully"}
+
+@router.put("/products/{product_id}/generics", response_model=List[ProdGenericSchema])
+def replace_product_generics(product_id: int, composition: CompositionReplace, db: Session = Depends(get_db)):
+    result = replace_compositions(db, {product_id: composition.generics}, composition.createdBy)
+    db.commit()
+    if result["changed"]:
+        events.publish("product_composition", result["changed"])
+    return (
+        db.query(ProdGeneric)
+        .options(joinedload(ProdGeneric.generic).joinedload(GenericMast.category))
+        .filter(ProdGeneric.prodCode == product_id)
+        .order_by(ProdGeneric.id)
+        .all()
+    )
+
+@router.put("/product-generics:replace", response_model=CompositionReplaceResult)
+def replace_product_generics_bulk(replacement: CompositionBulkReplace, db: Session = Depends(get_db)):
+    prod_codes = [entry.prodCode for entry in replacement.products]
+    if len(prod_codes) != len(set(prod_codes)):
+        raise HTTPException(status_code=400, detail="Each product may appear only once")
+    result = replace_compositions(db, {entry.prodCode: entry.generics for entry in replacement.products}, replacement.createdBy)
+    db.commit()
+    if result["changed"]:
+        events.publish("product_composition", result["changed"])
+    return result
+
+
+# Delta Sync Routes
+@router.get("/sync", response_model=SyncResponse)
+def sync_changes(
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full download"),
+    limit: int = Query(SYNC_BATCH_SIZE, ge=1, le=5000, description="Maximum rows per table; repeat with the new token while has_more is true"),
+    db: Session = Depends(get_read_db)
+):
+    return changes_since(db, since, limit)
+
+
+# POS Routes
+@router.get("/pos/products", response_model=List[PosProduct])
+def get_pos_products(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    active_only: bool = True,
+    sch_type_code: Optional[List[int]] = Query(None, description="Repeat to match any of several schedules"),
+    tax_code: Optional[List[int]] = Query(None, description="Sale taxCode; repeat to match any of several"),
+):
+    codes = product_snapshot.filter(active_only, sch_type_code, tax_code)
+    items = [row._asdict() for row in product_snapshot.rows(codes[skip:skip + limit])]
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json.response(items, response)
+    return items
+
+@router.get("/pos/products/{product_id}", response_model=PosProduct)
+def get_pos_product(product_id: int):
+    row = product_snapshot.get(product_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return row._asdict()
+
+
+# Pricing Routes
+@router.post("/pricing/compute", response_model=PricingResult)
+def compute_pricing(request: PricingRequest, db: Session = Depends(get_read_db)):
+    # Tax codes and rates come from the database: the product snapshot and
+    # the taxes cache may both lag other workers' writes
+    tax_column = ProdMast.salTaxCode if request.taxType == "sale" else ProdMast.purTaxCode
+    codes = {line.prodCode for line in request.lines}
+    taxes = (
+        db.query(ProdMast.prodCode, TaxMast.taxCode, TaxMast.igst, TaxMast.cgst, TaxMast.sgst)
+        .join(TaxMast, TaxMast.taxCode == tax_column)
+        .filter(ProdMast.prodCode.in_(codes))
+        .all()
+    )
+    product_taxes = {tax.prodCode: tax.taxCode for tax in taxes}
+    missing = sorted(codes - product_taxes.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(map(str, missing))}")
+
+    rates = tax_rates(taxes)
+    return compute_lines(request.lines, [product_taxes[line.prodCode] for line in request.lines], rates)
+
+
+# Batch Operation Routes
+@router.post("/batch", response_model=BatchResult)
+def run_batch_operations(batch: BatchRequest, db: Session = Depends(get_db)):
+    return {"results": run_batch(db, batch.operations)}
@@ -0,0 +1,204 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from app.core.cache import master_cache
+from app.core.database import get_async_db
+from app.models.models import ProdMast, ProdTypeMast, ProdCatMast, MfrMast, SchTypeMast, GenericMast, TaxMast, ProdGeneric
+from app.api.expand import (
+    EXPAND_DESCRIPTION, PRODUCT_RELATIONS, parse_product_expand, product_details, product_load_options
+)
+from app.services import catalog, events
+from app.services.sync import record_deletions
+from app.api.schemas import (
+    Prod, ProdCreate, ProdUpdate, ProdDetail,
+    ProdType, ProdCat, Mfr, SchType, Generic, Tax,
+    ProdGeneric as ProdGenericSchema
+)
+
+# Async counterparts of the main read routes and product writes, mounted
+# under /async when ASYNC_DB_ENABLED is set so both stacks can be load-tested
+router = APIRouter()
+
+
+async def _cached_master(db: AsyncSession, key: str, model, schema, pk) -> list:
+    def load(session):
+        return master_cache.get_or_load(
+            key, lambda: [schema.model_validate(row) for row in session.query(model).order_by(pk).all()]
+        )
+    return await db.run_sync(load)
+
+
+async def _get_or_404(db: AsyncSession, stmt, detail: str):
+    row = (await db.execute(stmt)).scalars().first()
+    if not row:
+        raise HTTPException(status_code=404, detail=detail)
+    return row
+
+
+async def _reload_product(db: AsyncSession, prod_code: int) -> ProdMast:
+    # Committed objects are expired and lazy loads cannot run here, so re-select with relations
+    stmt = (
+        select(ProdMast)
+        .options(*product_load_options(set(PRODUCT_RELATIONS)))
+        .where(ProdMast.prodCode == prod_code)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.execute(stmt)).scalars().one()
+
+
+# Product Routes
+@router.get("/products", response_model=List[ProdDetail])
+async def get_products(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    is_active: Optional[bool] = None,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    relations = parse_product_expand(expand)
+    stmt = select(ProdMast).options(*product_load_options(relations))
+    if is_active is not None:
+        stmt = stmt.where(ProdMast.isActive == is_active)
+    products = (await db.execute(stmt.offset(skip).limit(limit))).unique().scalars().all()
+    return product_details(products, relations)
+
+@router.post("/products", response_model=Prod)
+async def create_product(product: ProdCreate, db: AsyncSession = Depends(get_async_db)):
+    db_product = ProdMast(**product.dict())
+    db.add(db_product)
+    await db.flush()
+    prod_code = db_product.prodCode
+    await db.run_sync(lambda session: catalog.refresh_products(session, [prod_code]))
+    await db.commit()
+    db_product = await _reload_product(db, prod_code)
+    await run_in_threadpool(events.publish, "product", [prod_code])
+    return db_product
+
+@router.get("/products/{product_id}", response_model=ProdDetail)
+async def get_product(
+    product_id: int,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    relations = parse_product_expand(expand)
+    stmt = select(ProdMast).options(*product_load_options(relations)).where(ProdMast.prodCode == product_id)
+    product = await _get_or_404(db, stmt, "Product not found")
+    return product_details([product], relations)[0]
+
+@router.put("/products/{product_id}", response_model=Prod)
+async def update_product(product_id: int, product: ProdUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_product = await _get_or_404(db, select(ProdMast).where(ProdMast.prodCode == product_id), "Product not found")
+
+    update_data = product.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_product, field, value)
+
+    await db.run_sync(lambda session: catalog.refresh_products(session, [product_id]))
+    await db.commit()
+    db_product = await _reload_product(db, product_id)
+    await run_in_threadpool(events.publish, "product", [product_id])
+    return db_product
+
+@router.delete("/products/{product_id}")
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    product = await _get_or_404(db, select(ProdMast).where(ProdMast.prodCode == product_id), "Product not found")
+    await db.delete(product)
+    await db.run_sync(lambda session: record_deletions(session, ProdMast, [product_id]))
+    await db.run_sync(lambda session: catalog.refresh_products(session, [product_id]))
+    await db.commit()
+    await run_in_threadpool(events.publish, "product", [product_id])
+    return {"message": "Product deleted successfully"}
+
+
+# Cached master routes
+@router.get("/product-types", response_model=List[ProdType])
+async def get_product_types(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    product_types = await _cached_master(db, "product_types", ProdTypeMast, ProdType, ProdTypeMast.prodTypeCode)
+    return product_types[skip:skip + limit]
+
+@router.get("/product-categories", response_model=List[ProdCat])
+async def get_product_categories(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    categories = await _cached_master(db, "product_categories", ProdCatMast, ProdCat, ProdCatMast.prodCatCode)
+    return categories[skip:skip + limit]
+
+@router.get("/taxes", response_model=List[Tax])
+async def get_taxes(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    taxes = await _cached_master(db, "taxes", TaxMast, Tax, TaxMast.taxCode)
+    return taxes[skip:skip + limit]
+
+@router.get("/schedule-types", response_model=List[SchType])
+async def get_schedule_types(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    schedule_types = await _cached_master(db, "schedule_types", SchTypeMast, SchType, SchTypeMast.schTypeCode)
+    return schedule_types[skip:skip + limit]
+
+
+# Manufacturer Routes
+@router.get("/manufacturers", response_model=List[Mfr])
+async def get_manufacturers(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return (await db.execute(select(MfrMast).offset(skip).limit(limit))).scalars().all()
+
+@router.get("/manufacturers/{mfr_id}", response_model=Mfr)
+async def get_manufacturer(mfr_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _get_or_404(db, select(MfrMast).where(MfrMast.mfrCode == mfr_id), "Manufacturer not found")
+
+
+# Generic Routes
+@router.get("/generics", response_model=List[Generic])
+async def get_generics(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    stmt = select(GenericMast).options(joinedload(GenericMast.category))
+    if category_id:
+        stmt = stmt.where(GenericMast.prodCatCode == category_id)
+    return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
+
+@router.get("/generics/{generic_id}", response_model=Generic)
+async def get_generic(generic_id: int, db: AsyncSession = Depends(get_async_db)):
+    stmt = select(GenericMast).options(joinedload(GenericMast.category)).where(GenericMast.genericCode == generic_id)
+    return await _get_or_404(db, stmt, "Generic not found")
+
+
+# Product Generic Mapping Routes
+@router.get("/product-generics", response_model=List[ProdGenericSchema])
+async def get_product_generics(
+    product_id: Optional[int] = None,
+    generic_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    stmt = select(ProdGeneric).options(
+        selectinload(ProdGeneric.product).options(*product_load_options(set(PRODUCT_RELATIONS))),
+        joinedload(ProdGeneric.generic).joinedload(GenericMast.category)
+    )
+    if product_id:
+        stmt = stmt.where(ProdGeneric.prodCode == product_id)
+    if generic_id:
+        stmt = stmt.where(ProdGeneric.genericCode == generic_id)
+    return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_serializer
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List, TypeVar
+import typing
+
+T = TypeVar("T")
 
 # Tax Schemas
 class TaxBase(BaseModel):
@@ -198,6 +201,144 @@ class Prod(ProdBase):
         from_attributes = True
 
 
+# Product with expandable relations; generics is only filled when requested
+class ProdComposition(BaseModel):
+    id: int
+    genericCode: int
+    genericStrength: str
+    generic: Optional[Generic] = None
+    
+    class Config:
+        from_attributes = True
+
+class ProdDetail(Prod):
+    generics: Optional[List[ProdComposition]] = None
+    
+    # Left out entirely unless requested, so default payloads keep their shape
+    @model_serializer(mode="wrap")
+    def _omit_unrequested_generics(self, handler):
+        data = handler(self)
+        if self.generics is None:
+            data.pop("generics", None)
+        return data
+
+
+# Flattened catalog row
+class ProdCatalogEntry(BaseModel):
+    prodCode: int
+    prodName: str
+    hsnCode: Optional[str] = None
+    packing: str
+    mrp: float
+    isActive: bool
+    mfrCode: int
+    mfrName: str
+    mfrShortName: str
+    prodTypeCode: int
+    prodTypeName: str
+    schTypeCode: int
+    schTypeName: str
+    salTaxCode: int
+    saleTaxDesc: str
+    saleTaxRate: float
+    composition: Optional[str] = None
+    refreshedDate: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Product autocomplete hit
+class ProdSearchHit(BaseModel):
+    prodCode: int
+    prodName: str
+    hsnCode: Optional[str] = None
+    mfrShortName: Optional[str] = None
+    mrp: float
+    isActive: bool
+
+
+# Point-of-sale product row, served from the in-memory snapshot
+class PosProduct(BaseModel):
+    prodCode: int
+    prodName: str
+    mrp: float
+    salTaxCode: int
+    purTaxCode: int
+    schTypeCode: int
+    isActive: bool
+
+
+# Full-text search hit; id is the prodCode, genericCode or mfrCode
+class SearchHit(BaseModel):
+    entity: str
+    id: int
+    title: str
+    content: str
+    isActive: bool
+    rank: float
+
+
+# Bulk product import result
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[BulkRowError]
+
+
+# Delta sync
+class SyncTombstone(BaseModel):
+    entity: str
+    id: int
+    deletedDate: datetime
+
+class SyncResponse(BaseModel):
+    token: str
+    has_more: bool
+    # Raw column values keyed by table name, parents before children
+    changes: Dict[str, List[Dict[str, Any]]]
+    deleted: List[SyncTombstone]
+
+
+# GST pricing
+class PricingLine(BaseModel):
+    prodCode: int
+    qty: float = Field(..., gt=0)
+    rate: float = Field(..., ge=0)
+    interState: bool = False
+
+class PricingRequest(BaseModel):
+    # Sale invoices use each product's salTaxCode, purchase invoices its purTaxCode
+    taxType: Literal["sale", "purchase"] = "sale"
+    lines: List[PricingLine] = Field(..., min_length=1, max_length=10000)
+
+class PricedLine(PricingLine):
+    taxCode: int
+    taxableValue: float
+    igst: float
+    cgst: float
+    sgst: float
+    taxAmount: float
+    total: float
+
+class PricingTotals(BaseModel):
+    taxableValue: float
+    igst: float
+    cgst: float
+    sgst: float
+    taxAmount: float
+    total: float
+
+class PricingResult(BaseModel):
+    lines: List[PricedLine]
+    totals: PricingTotals
+
+
 # Product Generic Schemas
 class ProdGenericBase(BaseModel):
     prodCode: int
@@ -222,10 +363,75 @@ class ProdGeneric(ProdGenericBase):
         from_attributes = True
 
 
+# Whole-composition replace; generics not listed are removed from the product
+class CompositionEntry(BaseModel):
+    genericCode: int
+    genericStrength: str = Field(..., max_length=50)
+
+class CompositionReplace(BaseModel):
+    generics: List[CompositionEntry] = Field(..., max_length=100)
+    createdBy: str = Field(..., max_length=50)
+
+class ProductCompositionReplace(BaseModel):
+    prodCode: int
+    generics: List[CompositionEntry] = Field(..., max_length=100)
+
+class CompositionBulkReplace(BaseModel):
+    products: List[ProductCompositionReplace] = Field(..., min_length=1, max_length=5000)
+    createdBy: str = Field(..., max_length=50)
+
+class CompositionReplaceResult(BaseModel):
+    products: int
+    inserted: int
+    updated: int
+    deleted: int
+    # Products whose mappings were actually touched
+    changed: List[int]
+
+
+# Batch operations (unit of work)
+# Values written as {"$ref": "<name>"} take the id created by the earlier
+# operation declaring that ref
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    entity: Literal[
+        "product", "product_type", "product_category", "manufacturer",
+        "tax", "schedule_type", "generic", "product_generic"
+    ]
+    id: Optional[typing.Union[int, Dict[str, str]]] = None
+    ref: Optional[str] = Field(None, max_length=50)
+    data: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=1000)
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    entity: str
+    id: int
+    ref: Optional[str] = None
+
+class BatchResult(BaseModel):
+    results: List[BatchOperationResult]
+
+
 # Pagination Response
-class PaginationResponse(BaseModel):
-    total: int
-    page: int
+# Offset pages fill total/page/total_pages; cursor pages fill next_cursor instead
+class PaginationResponse(BaseModel, typing.Generic[T]):
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
-    items: List[dict]
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    items: List[T]
+
+
+# Batch lookup by ids
+class BatchIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BatchResponse(BaseModel, typing.Generic[T]):
+    items: List[T]
+    # Requested ids with no matching row, in request order
+    missing: List[int]
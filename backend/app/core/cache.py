@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+from .config import settings
+
+
+class MasterCache:
+    """Read-through cache holding small master tables fully in memory.
+
+    Each key maps to the complete, ordered row list of one table. Entries
+    expire after ``ttl_seconds``, the least recently used entry is evicted
+    beyond ``max_entries``, and tables larger than ``max_rows`` are served
+    from the loader without being cached.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, max_rows: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Bumped on invalidation so a load that raced a write is not stored
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: str, loader: Callable[[], List]) -> List:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(key, 0)
+
+        rows = loader()
+        if len(rows) > self.max_rows:
+            return rows
+
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return rows
+            self._entries[key] = (now + self.ttl_seconds, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return rows
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+master_cache = MasterCache(
+    ttl_seconds=settings.MASTER_CACHE_TTL_SECONDS,
+    max_entries=settings.MASTER_CACHE_MAX_ENTRIES,
+    max_rows=settings.MASTER_CACHE_MAX_ROWS,
+)
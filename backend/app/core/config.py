@@ -5,17 +5,66 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     
+    # Optional read replica for GET routes; clients read from the primary for
+    # READ_YOUR_WRITES_SECONDS after their last write
+    READ_DATABASE_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: int = 5
+    
+    # Async database stack (opt-in); URL defaults to DATABASE_URL with an async driver
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_VERSION: str = "v1"
     PROJECT_NAME: str = "Pharma ERP System"
     
+    # Encode large list responses with orjson from column rows, skipping ORM
+    # objects and response-model re-validation (same JSON, needs orjson)
+    FAST_JSON_RESPONSES: bool = False
+    
+    # Response compression (br when the brotli package is installed, else gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    
+    # Cross-worker invalidation of in-process caches and indexes:
+    # "postgres" (LISTEN/NOTIFY on DATABASE_URL) or "local" (UNIX sockets in
+    # INVALIDATION_SOCKET_DIR, for tests and single-host runs); unset = off
+    INVALIDATION_BUS: Optional[str] = None
+    INVALIDATION_CHANNEL: str = "pharma_invalidation"
+    INVALIDATION_SOCKET_DIR: str = "/tmp/pharma-invalidation"
+    
+    # Startup warmup: open pool connections and run each GET route once before
+    # serving, so the first requests after a restart skip SQL compilation
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 5
+    
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Master table cache
+    MASTER_CACHE_TTL_SECONDS: int = 300
+    MASTER_CACHE_MAX_ENTRIES: int = 16
+    MASTER_CACHE_MAX_ROWS: int = 1000
+    
+    # ETag validators of list queries, cached until the next change event;
+    # the TTL bounds staleness of other workers' writes without INVALIDATION_BUS
+    VALIDATOR_CACHE_TTL_SECONDS: int = 10
+    VALIDATOR_CACHE_MAX_ENTRIES: int = 256
+    
+    # Per-worker indexes, patched from change events and reloaded whole at
+    # these ages (other workers' writes without INVALIDATION_BUS, or a lost
+    # bus message, are visible after at most this): the product snapshot
+    # behind the /pos routes, the composition index behind substitutes, and
+    # the autocomplete index, which only ranks suggestions and costs the most
+    # to rebuild
+    PRODUCT_SNAPSHOT_MAX_AGE_SECONDS: int = 60
+    COMPOSITION_INDEX_MAX_AGE_SECONDS: int = 60
+    SEARCH_INDEX_MAX_AGE_SECONDS: int = 300
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -2,14 +2,19 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from fastapi import Request
+from .metrics import InstrumentedQueuePool, instrument_engine
+from .read_routing import reads_from_primary
 
 # SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20
 )
+instrument_engine(engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,3 +29,65 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Read replica engine; without READ_DATABASE_URL reads share the primary
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(
+        settings.READ_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+    instrument_engine(read_engine, name="replica")
+else:
+    read_engine = engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+# Dependency to get a DB session for read-only routes
+def get_read_db(request: Request):
+    # Read-only POSTs (batch lookups, pricing) must not make the client sticky
+    request.state.read_only = True
+    db = SessionLocal() if reads_from_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async drivers for the URL schemes DATABASE_URL may use
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+# Optional async engine, only created when enabled so asyncpg stays optional
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    # aiosqlite runs without a sized pool; server databases get the same pool as the sync engine
+    pool_options = {} if async_url.startswith("sqlite") else {"pool_size": 10, "max_overflow": 20}
+    async_engine = create_async_engine(async_url, pool_pre_ping=True, **pool_options)
+    instrument_engine(async_engine.sync_engine, name="async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,213 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "_started")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self._started: List[float] = []
+
+
+# Per-request SQL counters, set by the middleware and filled by engine events
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Tuple[str, Sequence[float], Dict[Labels, Histogram]]] = {}
+        self._counters: Dict[str, Tuple[str, Dict[Labels, float]]] = {}
+        # Gauges are sampled at render time; several samplers may feed one name
+        self._gauges: Dict[str, Tuple[str, List[Callable[[], Dict[Labels, float]]]]] = {}
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float]) -> None:
+        self._histograms.setdefault(name, (help_text, buckets, {}))
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._counters.setdefault(name, (help_text, {}))
+
+    def gauge(self, name: str, help_text: str, sample: Callable[[], Dict[Labels, float]]) -> None:
+        self._gauges.setdefault(name, (help_text, []))[1].append(sample)
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        _, buckets, series = self._histograms[name]
+        with self._lock:
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, labels: Labels = ()) -> None:
+        _, series = self._counters[name]
+        with self._lock:
+            series[labels] = series.get(labels, 0) + value
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, (help_text, buckets, series) in self._histograms.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.buckets) + [float("inf")], histogram.counts):
+                        cumulative += count
+                        le = 'le="%s"' % _format_number(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for name, (help_text, series) in self._counters.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        for name, (help_text, samplers) in self._gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            values: Dict[Labels, float] = {}
+            for sample in samplers:
+                values.update(sample())
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.histogram("pharma_http_request_duration_seconds", "Request latency by route.", LATENCY_BUCKETS)
+metrics.histogram("pharma_db_statements_per_request", "SQL statements executed per request.", STATEMENT_BUCKETS)
+metrics.histogram("pharma_db_time_per_request_seconds", "Time spent executing SQL per request.", LATENCY_BUCKETS)
+metrics.histogram("pharma_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", POOL_WAIT_BUCKETS)
+metrics.counter("pharma_db_statements_total", "SQL statements executed, by route.")
+metrics.counter("pharma_db_pool_checkouts_total", "Connections checked out of the pool.")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe("pharma_db_pool_checkout_wait_seconds", time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats._started.append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None and stats._started:
+        stats.db_time += time.perf_counter() - stats._started.pop()
+        stats.statements += 1
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """Count statements per request and sample pool usage for ``engine``."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(
+        engine.pool, "checkout",
+        lambda *args: metrics.inc("pharma_db_pool_checkouts_total", labels=(("engine", name),))
+    )
+
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        labels = (("engine", name),)
+        metrics.gauge("pharma_db_pool_size", "Configured pool size.", lambda: {labels: pool.size()})
+        metrics.gauge("pharma_db_pool_checked_out", "Connections currently checked out.", lambda: {labels: pool.checkedout()})
+        metrics.gauge("pharma_db_pool_overflow", "Connections open beyond pool_size.", lambda: {labels: max(pool.overflow(), 0)})
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[Callable, str] = {}
+
+    def _route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if not self._route_paths:
+            for route in scope["app"].routes:
+                if hasattr(route, "endpoint"):
+                    self._route_paths[route.endpoint] = getattr(route, "path_format", route.path)
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Startup warmup requests are not traffic
+        if scope.get("state", {}).get("warmup"):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = (("method", scope["method"]), ("route", self._route_path(scope)))
+            metrics.observe("pharma_http_request_duration_seconds", elapsed, route + (("status", str(status[0])),))
+            metrics.observe("pharma_db_statements_per_request", stats.statements, route)
+            metrics.observe("pharma_db_time_per_request_seconds", stats.db_time, route)
+            metrics.inc("pharma_db_statements_total", stats.statements, route)
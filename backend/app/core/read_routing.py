@@ -0,0 +1,46 @@
+import time
+
+from .config import settings
+
+# Set on successful writes; a later read carrying a future timestamp in either
+# one is served from the primary so the client sees its own write
+STICKY_COOKIE = "pharma_primary_until"
+STICKY_HEADER = "X-Primary-Until"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def reads_from_primary(request) -> bool:
+    if not settings.READ_DATABASE_URL:
+        return True
+    value = request.cookies.get(STICKY_COOKIE) or request.headers.get(STICKY_HEADER)
+    try:
+        return float(value) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware marking clients that just wrote, via cookie and response header."""
+
+    def __init__(self, app, window_seconds: int):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            read_only = scope.get("state", {}).get("read_only", False)
+            if message["type"] == "http.response.start" and message["status"] < 400 and not read_only:
+                until = f"{time.time() + self.window_seconds:.3f}"
+                cookie = f"{STICKY_COOKIE}={until}; Max-Age={self.window_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+                headers.append((STICKY_HEADER.lower().encode("latin-1"), until.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
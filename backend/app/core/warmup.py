@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# GET routes that would read whole tables; their statements are compiled by
+# the paged routes over the same tables
+SKIPPED_PATHS = ("/products/export",)
+
+# Placeholder values for required query parameters
+QUERY_PLACEHOLDERS = {"q": "a", "ids": "1"}
+
+# Phase timings in seconds and warmup counts, reported by /health
+startup_stats: Dict[str, float] = {}
+
+
+def open_pool_connections(engine, count: int) -> int:
+    """Check out ``count`` connections at once so the pool creates them now."""
+    connections = []
+    try:
+        for _ in range(min(count, engine.pool.size())):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def warmup_requests(app, api_prefix: str, relations: List[str]) -> List[Tuple[str, str]]:
+    """(path, query string) pairs covering each GET route's statement shapes."""
+    requests = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods or not route.path.startswith(api_prefix):
+            continue
+        if route.path.endswith(SKIPPED_PATHS):
+            continue
+        path = route.path_format
+        for param in route.dependant.path_params:
+            path = path.replace("{" + param.name + "}", "1")
+        query_names = {param.name for param in route.dependant.query_params}
+        query = {name: value for name, value in QUERY_PLACEHOLDERS.items() if name in query_names}
+        if "limit" in query_names:
+            query["limit"] = 1
+        variants = [query]
+        # Cursor pages and expanded products compile different SQL than the defaults
+        if "cursor" in query_names:
+            variants.append({**query, "cursor": ""})
+        if "expand" in query_names:
+            variants.append({**query, "expand": ",".join(relations)})
+        requests += [(path, urlencode(variant)) for variant in variants]
+    return requests
+
+
+async def _call(app, path: str, query_string: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": query_string.encode("latin-1"),
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        "state": {"warmup": True},
+    }
+    status = [0]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def warm_routes(app, requests: List[Tuple[str, str]]) -> int:
+    """Run each request through the full app; returns how many did not fail."""
+    warmed = 0
+    for path, query_string in requests:
+        try:
+            status = await _call(app, path, query_string)
+        except Exception:
+            logger.warning("Warmup request %s?%s raised", path, query_string, exc_info=True)
+            continue
+        # 404s still compiled their lookup; only server errors count as failures
+        if status >= 500:
+            logger.warning("Warmup request %s?%s returned %s", path, query_string, status)
+            continue
+        warmed += 1
+    return warmed
+
+
+def record_timing(phase: str, started: float) -> None:
+    startup_stats[f"{phase}_seconds"] = round(time.perf_counter() - started, 4)
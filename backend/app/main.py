@@ -1,7 +1,30 @@
+import time
+
+# Taken before any other import so startup timing covers settings and model loading
+_import_started = time.perf_counter()
+
+import logging
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.core.cache import master_cache
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.api.routes import products
+from app.core.database import engine, read_engine
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.read_routing import STICKY_HEADER, ReadYourWritesMiddleware
+from app.core.warmup import open_pool_connections, record_timing, startup_stats, warm_routes, warmup_requests
+from app.api.expand import PRODUCT_EXPANSIONS
+from app.api.routes import products, products_async
+from app.services.composition_index import composition_index
+from app.services.search_index import product_search_index
+from app.services.product_snapshot import product_snapshot
+from app.services import events
+from app.services.invalidation_bus import create_bus
+from sqlalchemy.orm import configure_mappers
+
+logger = logging.getLogger(__name__)
 
 # Create FastAPI instance
 app = FastAPI(
@@ -20,6 +43,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[STICKY_HEADER],
+)
+
+# Send a client's reads to the primary for a short window after it writes
+if settings.READ_DATABASE_URL:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+# Compress larger responses for branch WAN links
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Per-route latency and SQL usage, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
+metrics.gauge(
+    "pharma_master_cache_events",
+    "Master cache counters by kind (hits, misses, evictions, invalidations).",
+    lambda: {(("kind", kind),): value for kind, value in master_cache.stats().items() if kind != "entries"}
 )
 
 # Include routers
@@ -29,6 +70,51 @@ app.include_router(
     tags=["Products"]
 )
 
+# Async variants of the product routes, opt-in for side-by-side load testing
+if settings.ASYNC_DB_ENABLED:
+    app.include_router(
+        products_async.router,
+        prefix=f"/api/{settings.API_VERSION}/async",
+        tags=["Products (async)"]
+    )
+
+# Apply other workers' writes to this worker's caches and indexes
+@app.on_event("startup")
+def start_invalidation_bus():
+    bus = create_bus(
+        settings.INVALIDATION_BUS, engine, settings.INVALIDATION_CHANNEL, settings.INVALIDATION_SOCKET_DIR
+    )
+    if bus is not None:
+        events.attach_bus(bus)
+
+@app.on_event("shutdown")
+def stop_invalidation_bus():
+    events.detach_bus()
+
+# Warm the pools and every GET route before the worker accepts traffic, so
+# the first requests after a deploy skip connection setup and SQL compilation
+@app.on_event("startup")
+async def warmup():
+    if not settings.WARMUP_ENABLED:
+        return
+    started = time.perf_counter()
+    configure_mappers()
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    startup_stats["pool_connections"] = 0
+    for pool_engine in engines:
+        startup_stats["pool_connections"] += await run_in_threadpool(
+            open_pool_connections, pool_engine, settings.WARMUP_POOL_CONNECTIONS
+        )
+    record_timing("pool", started)
+
+    routes_started = time.perf_counter()
+    requests = warmup_requests(app, f"/api/{settings.API_VERSION}", list(PRODUCT_EXPANSIONS))
+    startup_stats["warmup_requests"] = len(requests)
+    startup_stats["warmed_requests"] = await warm_routes(app, requests)
+    record_timing("routes", routes_started)
+    record_timing("warmup", started)
+    logger.info("Startup warmup finished: %s", startup_stats)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -44,9 +130,21 @@ async def health_check():
     return {
         "status": "healthy",
         "environment": settings.ENVIRONMENT,
-        "debug": settings.DEBUG
+        "debug": settings.DEBUG,
+        "master_cache": master_cache.stats(),
+        "search_index": product_search_index.stats(),
+        "composition_index": composition_index.stats(),
+        "product_snapshot": product_snapshot.stats(),
+        "startup": startup_stats
     }
 
+# Prometheus scrape endpoint
+@app.get(f"/api/{settings.API_VERSION}/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+record_timing("import", _import_started)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
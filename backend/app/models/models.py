@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, DDL, event, update
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -94,6 +94,9 @@ class GenericMast(Base):
     # Relations
     category = relationship("ProdCatMast", back_populates="generics")
     product_generics = relationship("ProdGeneric", back_populates="generic")
+    
+    # GET /generics?category_id=, in genericCode (cursor) order
+    __table_args__ = (Index("ix_GenericMast_prodCatCode", "prodCatCode", "genericCode"),)
 
 
 class ProdMast(Base):
@@ -105,12 +108,12 @@ class ProdMast(Base):
     packing = Column(String(50), nullable=False)
     purUnit = Column(String(20), nullable=False)
     salUnit = Column(String(20), nullable=False)
-    prodTypeCode = Column(Integer, ForeignKey("ProdTypeMast.prodTypeCode"), nullable=False)
-    mfrCode = Column(Integer, ForeignKey("MfrMast.mfrCode"), nullable=False)
+    prodTypeCode = Column(Integer, ForeignKey("ProdTypeMast.prodTypeCode"), nullable=False, index=True)
+    mfrCode = Column(Integer, ForeignKey("MfrMast.mfrCode"), nullable=False, index=True)
     mrp = Column(Float, default=0, nullable=False)
-    purTaxCode = Column(Integer, ForeignKey("TaxMast.taxCode"), nullable=False)
-    salTaxCode = Column(Integer, ForeignKey("TaxMast.taxCode"), nullable=False)
-    schTypeCode = Column(Integer, ForeignKey("SchTypeMast.schTypeCode"), nullable=False)
+    purTaxCode = Column(Integer, ForeignKey("TaxMast.taxCode"), nullable=False, index=True)
+    salTaxCode = Column(Integer, ForeignKey("TaxMast.taxCode"), nullable=False, index=True)
+    schTypeCode = Column(Integer, ForeignKey("SchTypeMast.schTypeCode"), nullable=False, index=True)
     isActive = Column(Boolean, default=True, nullable=False)
     inActiveFrom = Column(DateTime)
     createdDate = Column(DateTime, default=func.now(), nullable=False)
@@ -124,6 +127,18 @@ class ProdMast(Base):
     saleTax = relationship("TaxMast", foreign_keys=[salTaxCode], back_populates="products_sale")
     scheduleType = relationship("SchTypeMast", back_populates="products")
     product_generics = relationship("ProdGeneric", back_populates="product")
+    
+    # The foreign key indexes above serve master deletes and per-master lookups.
+    # Active products by name (the usual listing) get a partial index; the
+    # predicate is written as "= true" so filters on a bound isActive match it.
+    __table_args__ = (
+        Index(
+            "ix_ProdMast_active_prodName", "prodName", "prodCode",
+            postgresql_where=(isActive == True), sqlite_where=(isActive == True)
+        ),
+        Index("ix_ProdMast_prodName", "prodName", "prodCode"),
+        Index("ix_ProdMast_isActive", "isActive", "prodCode"),
+    )
 
 
 class ProdGeneric(Base):
@@ -141,5 +156,150 @@ class ProdGeneric(Base):
     product = relationship("ProdMast", back_populates="product_generics")
     generic = relationship("GenericMast", back_populates="product_generics")
     
-    # Unique constraint
-    __table_args__ = (UniqueConstraint('prodCode', 'genericCode', name='_prodCode_genericCode_uc'),)
+    # The unique constraint also serves lookups by product; the index serves
+    # lookups by generic (substitutes, GET /product-generics?generic_id=)
+    __table_args__ = (
+        UniqueConstraint('prodCode', 'genericCode', name='_prodCode_genericCode_uc'),
+        Index("ix_ProdGeneric_genericCode", "genericCode", "prodCode"),
+    )
+
+
+class DeletedRecord(Base):
+    __tablename__ = "DeletedRecord"
+    
+    # Tombstones for hard deletes, so delta sync clients can drop their copies
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(50), nullable=False)
+    entityId = Column(Integer, nullable=False)
+    deletedDate = Column(DateTime, default=func.now(), nullable=False)
+    
+    # Delta sync reads tombstones in (deletedDate, id) order
+    __table_args__ = (Index("ix_DeletedRecord_deletedDate", "deletedDate", "id"),)
+
+
+class TableVersion(Base):
+    __tablename__ = "TableVersion"
+    
+    # Change counter per table, bumped by every transaction that writes it,
+    # so ETags change on each commit even when counts and timestamps do not
+    tableName = Column(String(50), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+
+
+class ProdCatalog(Base):
+    __tablename__ = "ProdCatalog"
+    
+    # Flattened copy of each product with its master names and composition,
+    # maintained by the write routes so catalog reads need no joins
+    prodCode = Column(Integer, primary_key=True, autoincrement=False)
+    prodName = Column(String(50), nullable=False, index=True)
+    hsnCode = Column(String(15))
+    packing = Column(String(50), nullable=False)
+    mrp = Column(Float, nullable=False)
+    isActive = Column(Boolean, nullable=False)
+    mfrCode = Column(Integer, nullable=False, index=True)
+    mfrName = Column(String(50), nullable=False)
+    mfrShortName = Column(String(3), nullable=False)
+    prodTypeCode = Column(Integer, nullable=False)
+    prodTypeName = Column(String(50), nullable=False)
+    schTypeCode = Column(Integer, nullable=False)
+    schTypeName = Column(String(50), nullable=False)
+    salTaxCode = Column(Integer, nullable=False)
+    saleTaxDesc = Column(String(50), nullable=False)
+    saleTaxRate = Column(Float, nullable=False)
+    composition = Column(String(500))
+    refreshedDate = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (Index("ix_ProdCatalog_isActive", "isActive", "prodCode"),)
+
+
+class SearchDoc(Base):
+    __tablename__ = "SearchDoc"
+    
+    # One searchable document per product, generic and manufacturer, kept in
+    # step with the catalog; the full-text index is created per dialect below
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)
+    entityId = Column(Integer, nullable=False)
+    title = Column(String(100), nullable=False)
+    content = Column(String(600), nullable=False)
+    isActive = Column(Boolean, nullable=False)
+    
+    __table_args__ = (UniqueConstraint('entity', 'entityId', name='_searchDoc_entity_uc'),)
+
+
+# Titles rank above the composition and manufacturer text
+SEARCH_DOC_TSVECTOR = (
+    "setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', content), 'B')"
+)
+
+# These hooks cover create_all. Prisma-migrated (Postgres) databases get the
+# same GIN index from prisma/migrations/*_add_search_doc; SQLite databases
+# are only ever built by create_all.
+event.listen(SearchDoc.__table__, "after_create", DDL(
+    f'CREATE INDEX "ix_SearchDoc_fts" ON "SearchDoc" USING GIN (({SEARCH_DOC_TSVECTOR}))'
+).execute_if(dialect="postgresql"))
+
+# SQLite: an external-content FTS5 table over SearchDoc, kept in sync by triggers
+for _statement in (
+    'CREATE VIRTUAL TABLE "SearchDocFts" USING fts5('
+    "title, content, content='SearchDoc', content_rowid='id', prefix='2 3')",
+    'CREATE TRIGGER "SearchDoc_ai" AFTER INSERT ON "SearchDoc" BEGIN '
+    'INSERT INTO "SearchDocFts"(rowid, title, content) VALUES (new.id, new.title, new.content); END',
+    'CREATE TRIGGER "SearchDoc_ad" AFTER DELETE ON "SearchDoc" BEGIN '
+    'INSERT INTO "SearchDocFts"("SearchDocFts", rowid, title, content) VALUES (\'delete\', old.id, old.title, old.content); END',
+    'CREATE TRIGGER "SearchDoc_au" AFTER UPDATE ON "SearchDoc" BEGIN '
+    'INSERT INTO "SearchDocFts"("SearchDocFts", rowid, title, content) VALUES (\'delete\', old.id, old.title, old.content); '
+    'INSERT INTO "SearchDocFts"(rowid, title, content) VALUES (new.id, new.title, new.content); END',
+):
+    event.listen(SearchDoc.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(SearchDoc.__table__, "before_drop", DDL('DROP TABLE IF EXISTS "SearchDocFts"').execute_if(dialect="sqlite"))
+
+
+# Tables whose ETag validators carry a TableVersion (the rest are cached masters)
+VERSIONED_TABLES = ("ProdMast", "ProdGeneric", "GenericMast", "MfrMast")
+
+event.listen(TableVersion.__table__, "after_create", DDL(
+    'INSERT INTO "TableVersion" ("tableName", version) VALUES '
+    + ", ".join(f"('{table}', 0)" for table in VERSIONED_TABLES)
+))
+
+
+# The versioned tables a session has written are collected as it flushes or
+# runs DML, then bumped once at commit, in name order so that concurrent
+# committers cannot deadlock on the version rows. The bump commits with the
+# rows it describes, so no reader can see one without the other.
+def _written_tables(session: Session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    dirty = (instance for instance in session.dirty if session.is_modified(instance))
+    for instance in (*session.new, *session.deleted, *dirty):
+        _written_tables(session).add(type(instance).__tablename__)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_dml_tables(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        _written_tables(state.session).add(state.statement.table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_table_versions(session):
+    # Flush first: commit only flushes after this hook has run
+    session.flush()
+    tables = sorted(_written_tables(session).intersection(VERSIONED_TABLES))
+    for table in tables:
+        session.connection().execute(
+            update(TableVersion.__table__)
+            .where(TableVersion.__table__.c.tableName == table)
+            .values(version=TableVersion.__table__.c.version + 1)
+        )
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_written_tables(session):
+    session.info.pop("written_tables", None)
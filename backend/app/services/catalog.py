@@ -0,0 +1,128 @@
+from collections import defaultdict
+from typing import Collection, Dict, Iterable, List
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.models import (
+    GenericMast, MfrMast, ProdCatalog, ProdGeneric, ProdMast, ProdTypeMast, SchTypeMast, TaxMast
+)
+from app.services import fulltext
+
+# Products rebuilt per statement
+CATALOG_CHUNK_SIZE = 1000
+
+COMPOSITION_MAX_LENGTH = ProdCatalog.composition.type.length
+
+_CATALOG_COLUMNS = (
+    ProdMast.prodCode, ProdMast.prodName, ProdMast.hsnCode, ProdMast.packing, ProdMast.mrp, ProdMast.isActive,
+    ProdMast.mfrCode, MfrMast.mfrName, MfrMast.mfrShortName,
+    ProdMast.prodTypeCode, ProdTypeMast.prodTypeName,
+    ProdMast.schTypeCode, SchTypeMast.schTypeName,
+    ProdMast.salTaxCode, TaxMast.taxDesc.label("saleTaxDesc"), TaxMast.igst.label("saleTaxRate"),
+)
+
+# Catalog columns copied from each master, keyed by the catalog column holding its code
+_MASTER_COLUMNS = {
+    MfrMast: (ProdCatalog.mfrCode, {"mfrName": MfrMast.mfrName, "mfrShortName": MfrMast.mfrShortName}),
+    ProdTypeMast: (ProdCatalog.prodTypeCode, {"prodTypeName": ProdTypeMast.prodTypeName}),
+    SchTypeMast: (ProdCatalog.schTypeCode, {"schTypeName": SchTypeMast.schTypeName}),
+    TaxMast: (ProdCatalog.salTaxCode, {"saleTaxDesc": TaxMast.taxDesc, "saleTaxRate": TaxMast.igst}),
+}
+
+
+def _catalog_select():
+    return (
+        select(*_CATALOG_COLUMNS)
+        .join(MfrMast, MfrMast.mfrCode == ProdMast.mfrCode)
+        .join(ProdTypeMast, ProdTypeMast.prodTypeCode == ProdMast.prodTypeCode)
+        .join(SchTypeMast, SchTypeMast.schTypeCode == ProdMast.schTypeCode)
+        .join(TaxMast, TaxMast.taxCode == ProdMast.salTaxCode)
+    )
+
+
+def _compositions(db: Session, prod_codes: List[int]) -> Dict[int, str]:
+    # "Paracetamol 500mg + Caffeine 30mg", in mapping order
+    stmt = (
+        select(ProdGeneric.prodCode, GenericMast.genericName, ProdGeneric.genericStrength)
+        .join(GenericMast, GenericMast.genericCode == ProdGeneric.genericCode)
+        .where(ProdGeneric.prodCode.in_(prod_codes))
+        .order_by(ProdGeneric.prodCode, ProdGeneric.id)
+    )
+    parts = defaultdict(list)
+    for prod_code, name, strength in db.execute(stmt):
+        parts[prod_code].append(f"{name} {strength}")
+    return {prod_code: " + ".join(names)[:COMPOSITION_MAX_LENGTH] for prod_code, names in parts.items()}
+
+
+def _write_rows(db: Session, rows) -> List[dict]:
+    rows = [dict(row._mapping) for row in rows]
+    if not rows:
+        return rows
+    compositions = _compositions(db, [row["prodCode"] for row in rows])
+    for row in rows:
+        row["composition"] = compositions.get(row["prodCode"])
+    db.execute(insert(ProdCatalog), rows)
+    return rows
+
+
+def refresh_products(db: Session, prod_codes: Iterable[int]) -> None:
+    """Recompute the catalog rows and search documents of ``prod_codes`` in the caller's transaction.
+
+    Deleted products simply lose their rows. Pending ORM changes are flushed
+    first (sessions here do not autoflush), so call this after applying the
+    write and before committing.
+    """
+    db.flush()
+    codes = sorted(set(prod_codes))
+    for start in range(0, len(codes), CATALOG_CHUNK_SIZE):
+        chunk = codes[start:start + CATALOG_CHUNK_SIZE]
+        db.execute(delete(ProdCatalog).where(ProdCatalog.prodCode.in_(chunk)).execution_options(synchronize_session=False))
+        rows = _write_rows(db, db.execute(_catalog_select().where(ProdMast.prodCode.in_(chunk))))
+        fulltext.replace_products(db, chunk, rows)
+
+
+def refresh_master(db: Session, model, code: int, skip: Collection[int] = ()) -> None:
+    """Copy a new or changed master row into every catalog row and search document that shows it.
+
+    Products in ``skip`` are left alone, for callers that pass them to
+    ``refresh_products`` afterwards anyway.
+    """
+    db.flush()
+    if model is GenericMast:
+        # Generic names only appear inside composition strings
+        prod_codes = db.execute(select(ProdGeneric.prodCode).where(ProdGeneric.genericCode == code)).scalars().all()
+        refresh_products(db, set(prod_codes).difference(skip))
+        fulltext.refresh_generics(db, [code])
+        return
+    key, columns = _MASTER_COLUMNS[model]
+    pk = list(model.__table__.primary_key.columns)[0]
+    values = db.execute(select(*columns.values()).where(pk == code)).one()
+    stmt = update(ProdCatalog).where(key == code)
+    if skip:
+        stmt = stmt.where(ProdCatalog.prodCode.notin_(skip))
+    db.execute(stmt.values(dict(zip(columns, values))).execution_options(synchronize_session=False))
+    if model is MfrMast:
+        fulltext.refresh_manufacturers(db, [code])
+        fulltext.refresh_manufacturer_products(db, code, skip)
+
+
+def rebuild(db: Session) -> int:
+    """Replace the whole catalog and search index from the source tables; the caller commits."""
+    db.execute(delete(ProdCatalog).execution_options(synchronize_session=False))
+    fulltext.clear_products(db)
+    fulltext.refresh_manufacturers(db)
+    fulltext.refresh_generics(db)
+    total = 0
+    last_code = None
+    while True:
+        stmt = _catalog_select().order_by(ProdMast.prodCode).limit(CATALOG_CHUNK_SIZE)
+        if last_code is not None:
+            stmt = stmt.where(ProdMast.prodCode > last_code)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return total
+        written = _write_rows(db, rows)
+        fulltext.replace_products(db, [], written)
+        total += len(written)
+        last_code = rows[-1].prodCode
@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import ProdGeneric
+from app.services import events
+
+# Sorted ((genericCode, normalized strength), ...) describing one product's composition
+Signature = Tuple[Tuple[int, str], ...]
+
+_TRAILING_ZEROS = re.compile(r"(\d+)\.0+(?!\d)")
+
+
+def normalize_strength(strength: str) -> str:
+    # "500 MG", "500mg" and "500.0 mg" all describe the same strength
+    compact = "".join((strength or "").lower().split())
+    return _TRAILING_ZEROS.sub(r"\1", compact)
+
+
+class CompositionIndex:
+    """Maps each product to its composition signature and each signature to its products.
+
+    Built from ProdGeneric on first use, patched per product when mappings
+    change and reloaded whole once older than ``max_age_seconds``, so "same
+    composition" lookups are two dictionary reads.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._expires = 0.0
+        self._by_product: Dict[int, Signature] = {}
+        self._by_signature: Dict[Signature, Set[int]] = defaultdict(set)
+
+    def _set(self, prod_code: int, signature: Optional[Signature]) -> None:
+        previous = self._by_product.pop(prod_code, None)
+        if previous is not None:
+            members = self._by_signature[previous]
+            members.discard(prod_code)
+            if not members:
+                del self._by_signature[previous]
+        if signature:
+            self._by_product[prod_code] = signature
+            self._by_signature[signature].add(prod_code)
+
+    @staticmethod
+    def _signatures(db: Session, prod_codes: Optional[List[int]] = None) -> Dict[int, Signature]:
+        stmt = select(ProdGeneric.prodCode, ProdGeneric.genericCode, ProdGeneric.genericStrength)
+        if prod_codes is not None:
+            stmt = stmt.where(ProdGeneric.prodCode.in_(prod_codes))
+        parts: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+        for prod_code, generic_code, strength in db.execute(stmt):
+            parts[prod_code].append((generic_code, normalize_strength(strength)))
+        return {prod_code: tuple(sorted(items)) for prod_code, items in parts.items()}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded and time.monotonic() < self._expires:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded and now < self._expires:
+                return
+            db = SessionLocal()
+            try:
+                signatures = self._signatures(db)
+            finally:
+                db.close()
+            self._by_product.clear()
+            self._by_signature.clear()
+            for prod_code, signature in signatures.items():
+                self._set(prod_code, signature)
+            self._loaded = True
+            self._expires = now + self.max_age_seconds
+
+    def refresh(self, db: Session, prod_codes: Iterable[int]) -> None:
+        if not self._loaded:
+            return
+        prod_codes = list(prod_codes)
+        signatures = self._signatures(db, prod_codes)
+        with self._lock:
+            for prod_code in prod_codes:
+                self._set(prod_code, signatures.get(prod_code))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+            self._by_product.clear()
+            self._by_signature.clear()
+
+    def signature(self, prod_code: int) -> Optional[Signature]:
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_product.get(prod_code)
+
+    def substitutes(self, prod_code: int) -> Set[int]:
+        """Other products with exactly the same generics at the same strengths."""
+        self._ensure_loaded()
+        with self._lock:
+            signature = self._by_product.get(prod_code)
+            if signature is None:
+                return set()
+            return self._by_signature[signature] - {prod_code}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"loaded": int(self._loaded), "products": len(self._by_product), "signatures": len(self._by_signature)}
+
+
+composition_index = CompositionIndex(max_age_seconds=settings.COMPOSITION_INDEX_MAX_AGE_SECONDS)
+
+
+def _refresh_products(prod_codes: Optional[List[int]]) -> None:
+    if prod_codes is None:
+        composition_index.invalidate()
+        return
+    db = SessionLocal()
+    try:
+        composition_index.refresh(db, prod_codes)
+    finally:
+        db.close()
+
+
+events.subscribe("product_composition", _refresh_products)
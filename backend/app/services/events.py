@@ -0,0 +1,61 @@
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Handlers receive the changed primary keys, or None when any row of the
+# entity may have changed (bulk loads) and derived state should be rebuilt
+ChangeHandler = Callable[[Optional[List[int]]], None]
+
+_subscribers: Dict[str, List[ChangeHandler]] = defaultdict(list)
+
+# Forwards published changes to the other worker processes, if configured
+_bus = None
+
+
+def subscribe(entity: str, handler: ChangeHandler) -> None:
+    _subscribers[entity].append(handler)
+
+
+def attach_bus(bus) -> None:
+    """Send published changes to other workers and apply theirs here."""
+    global _bus
+    _bus = bus
+    bus.start(_apply_remote)
+
+
+def detach_bus() -> None:
+    global _bus
+    bus, _bus = _bus, None
+    if bus is not None:
+        bus.close()
+
+
+def publish(entity: str, ids: Optional[Iterable[int]] = None) -> None:
+    """Notify derived state in this and every other worker that ``entity`` rows changed.
+
+    Call after the write has been committed. Handler and bus failures are
+    logged and never fail the request that made the change.
+    """
+    changed = list(ids) if ids is not None else None
+    _dispatch(entity, changed)
+    if _bus is not None:
+        try:
+            _bus.publish(entity, changed)
+        except Exception:
+            logger.exception("Could not forward %s %s to other workers", entity, changed)
+
+
+def _apply_remote(entity: str, ids: Optional[List[int]]) -> None:
+    # "*" after the bus reconnects: anything may have changed meanwhile
+    for name in (list(_subscribers) if entity == "*" else [entity]):
+        _dispatch(name, ids)
+
+
+def _dispatch(entity: str, changed: Optional[List[int]]) -> None:
+    for handler in _subscribers.get(entity, []):
+        try:
+            handler(changed)
+        except Exception:
+            logger.exception("Change handler %r failed for %s %s", handler, entity, changed)
@@ -0,0 +1,158 @@
+import re
+from typing import Collection, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.models import SEARCH_DOC_TSVECTOR, GenericMast, MfrMast, ProdCatalog, SearchDoc
+
+# Ids per IN list when replacing documents
+DOC_CHUNK_SIZE = 1000
+
+# Extra query words are ignored
+MAX_QUERY_TERMS = 8
+
+TITLE_MAX_LENGTH = SearchDoc.title.type.length
+CONTENT_MAX_LENGTH = SearchDoc.content.type.length
+
+# FTS5 bm25 column weights (title, content), matching the tsvector A/B weights
+SQLITE_WEIGHTS = (10.0, 1.0)
+
+
+def _product_doc(row) -> dict:
+    content = " ".join(part for part in (row["composition"], row["mfrName"]) if part)
+    return {
+        "entity": "product", "entityId": row["prodCode"], "title": row["prodName"][:TITLE_MAX_LENGTH],
+        "content": content[:CONTENT_MAX_LENGTH], "isActive": row["isActive"],
+    }
+
+
+def _replace(db: Session, entity: str, ids: Sequence[int], docs: List[dict]) -> None:
+    for start in range(0, len(ids), DOC_CHUNK_SIZE):
+        chunk = ids[start:start + DOC_CHUNK_SIZE]
+        db.execute(
+            delete(SearchDoc).where(SearchDoc.entity == entity, SearchDoc.entityId.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+    if docs:
+        db.execute(insert(SearchDoc), docs)
+
+
+def replace_products(db: Session, prod_codes: Sequence[int], catalog_rows: Sequence[dict]) -> None:
+    """Rewrite product documents from freshly written catalog rows."""
+    _replace(db, "product", list(prod_codes), [_product_doc(row) for row in catalog_rows])
+
+
+def refresh_manufacturer_products(db: Session, mfr_code: int, skip: Collection[int] = ()) -> None:
+    # Product documents include the manufacturer name
+    columns = (ProdCatalog.prodCode, ProdCatalog.prodName, ProdCatalog.composition, ProdCatalog.mfrName, ProdCatalog.isActive)
+    stmt = select(*columns).where(ProdCatalog.mfrCode == mfr_code)
+    if skip:
+        stmt = stmt.where(ProdCatalog.prodCode.notin_(skip))
+    rows = db.execute(stmt).mappings().all()
+    replace_products(db, [row["prodCode"] for row in rows], rows)
+
+
+def refresh_manufacturers(db: Session, codes: Optional[Iterable[int]] = None) -> None:
+    """Rewrite manufacturer documents; all of them when ``codes`` is None."""
+    stmt = select(MfrMast.mfrCode, MfrMast.mfrName, MfrMast.mfrShortName, MfrMast.city)
+    if codes is not None:
+        codes = list(codes)
+        stmt = stmt.where(MfrMast.mfrCode.in_(codes))
+    docs = [
+        {
+            "entity": "manufacturer", "entityId": code, "title": name,
+            "content": " ".join(part for part in (short_name, city) if part), "isActive": True,
+        }
+        for code, name, short_name, city in db.execute(stmt)
+    ]
+    if codes is None:
+        db.execute(delete(SearchDoc).where(SearchDoc.entity == "manufacturer").execution_options(synchronize_session=False))
+        codes = []
+    _replace(db, "manufacturer", codes, docs)
+
+
+def refresh_generics(db: Session, codes: Optional[Iterable[int]] = None) -> None:
+    """Rewrite generic documents; all of them when ``codes`` is None."""
+    stmt = select(GenericMast.genericCode, GenericMast.genericName)
+    if codes is not None:
+        codes = list(codes)
+        stmt = stmt.where(GenericMast.genericCode.in_(codes))
+    docs = [
+        {"entity": "generic", "entityId": code, "title": name, "content": "", "isActive": True}
+        for code, name in db.execute(stmt)
+    ]
+    if codes is None:
+        db.execute(delete(SearchDoc).where(SearchDoc.entity == "generic").execution_options(synchronize_session=False))
+        codes = []
+    _replace(db, "generic", codes, docs)
+
+
+def clear_products(db: Session) -> None:
+    db.execute(delete(SearchDoc).where(SearchDoc.entity == "product").execution_options(synchronize_session=False))
+
+
+def _terms(q: str) -> List[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_QUERY_TERMS]
+
+
+def _search_sql(dialect: str, entity: Optional[str], active_only: bool) -> str:
+    filters = ""
+    if entity is not None:
+        filters += ' AND d.entity = :entity'
+    if active_only:
+        filters += " AND (d.\"isActive\" OR d.entity <> 'product')"
+    columns = 'd.id, d.entity, d."entityId", d.title, d.content, d."isActive"'
+    if dialect == "postgresql":
+        # The tsvector expression matches the GIN index, so the match is an index scan
+        hits = (
+            f"SELECT {columns}, ts_rank({SEARCH_DOC_TSVECTOR}, query) AS rank "
+            f"FROM \"SearchDoc\" d, to_tsquery('simple', :query) query "
+            f"WHERE {SEARCH_DOC_TSVECTOR} @@ query{filters}"
+        )
+    elif dialect == "sqlite":
+        title_weight, content_weight = SQLITE_WEIGHTS
+        hits = (
+            f'SELECT {columns}, -bm25("SearchDocFts", {title_weight}, {content_weight}) AS rank '
+            'FROM "SearchDocFts" JOIN "SearchDoc" d ON d.id = "SearchDocFts".rowid '
+            f'WHERE "SearchDocFts" MATCH :query{filters}'
+        )
+    else:
+        raise HTTPException(status_code=501, detail="Full-text search needs PostgreSQL or SQLite")
+    # The total counts every hit, not the page, and the outer join still
+    # returns it (with a null page row) when skip is past the last hit
+    return (
+        f"WITH hits AS ({hits}) "
+        "SELECT counted.total, page.* FROM (SELECT count(*) AS total FROM hits) counted "
+        "LEFT JOIN (SELECT * FROM hits ORDER BY rank DESC, id LIMIT :limit OFFSET :skip) page ON 1 = 1 "
+        "ORDER BY page.rank DESC, page.id"
+    )
+
+
+def search(
+    db: Session, q: str, entity: Optional[str] = None, active_only: bool = True, skip: int = 0, limit: int = 20
+) -> Tuple[int, List[dict]]:
+    """Ranked documents matching every word of ``q`` as a prefix; returns (total, page)."""
+    terms = _terms(q)
+    if not terms:
+        return 0, []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        query = " & ".join(f"{term}:*" for term in terms)
+    else:
+        query = " ".join(f'"{term}"*' for term in terms)
+    params = {"query": query, "limit": limit, "skip": skip}
+    if entity is not None:
+        params["entity"] = entity
+    rows = db.execute(text(_search_sql(dialect, entity, active_only)), params).mappings().all()
+    total = rows[0]["total"]
+    hits = [
+        {
+            "entity": row["entity"], "id": row["entityId"], "title": row["title"], "content": row["content"],
+            "isActive": bool(row["isActive"]), "rank": float(row["rank"]),
+        }
+        for row in rows
+        if row["id"] is not None
+    ]
+    return total, hits
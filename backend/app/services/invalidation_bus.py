@@ -0,0 +1,182 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+import os
+import select
+import socket
+import threading
+import uuid
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called with (entity, ids) for changes made by other workers; ids is None
+# when the sender or a reconnect means any row may have changed
+RemoteHandler = Callable[[str, Optional[List[int]]], None]
+
+# Postgres NOTIFY payloads must stay under 8000 bytes; a datagram's limit is
+# the socket buffer. Larger id lists are sent as "everything changed".
+POSTGRES_PAYLOAD_LIMIT = 7900
+DATAGRAM_PAYLOAD_LIMIT = 60000
+
+RECONNECT_SECONDS = 5
+
+
+class InvalidationBus(ABC):
+    """Carries change events between the worker processes of one deployment."""
+
+    payload_limit = DATAGRAM_PAYLOAD_LIMIT
+
+    def __init__(self):
+        # Postgres delivers a worker's own notifications back to it
+        self.origin = uuid.uuid4().hex
+        self._handler: Optional[RemoteHandler] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, handler: RemoteHandler) -> None:
+        self._handler = handler
+        self._thread = threading.Thread(target=self._listen, name=f"{type(self).__name__}-listener", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=RECONNECT_SECONDS + 1)
+
+    def publish(self, entity: str, ids: Optional[List[int]]) -> None:
+        payload = self._encode(entity, ids)
+        if len(payload) > self.payload_limit:
+            payload = self._encode(entity, None)
+        self._send(payload)
+
+    def _encode(self, entity: str, ids: Optional[List[int]]) -> str:
+        return json.dumps({"origin": self.origin, "entity": entity, "ids": ids}, separators=(",", ":"))
+
+    def _receive(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            if message["origin"] == self.origin:
+                return
+            self._handler(message["entity"], message["ids"])
+        except Exception:
+            logger.exception("Could not apply invalidation %r", payload)
+
+    @abstractmethod
+    def _send(self, payload: str) -> None:
+        """Deliver ``payload`` to every other worker."""
+
+    @abstractmethod
+    def _listen(self) -> None:
+        """Pass incoming payloads to ``_receive`` until the bus is closed; runs on the listener thread."""
+
+
+class PostgresBus(InvalidationBus):
+    """LISTEN/NOTIFY on one channel; needs psycopg2 and a Postgres DATABASE_URL."""
+
+    payload_limit = POSTGRES_PAYLOAD_LIMIT
+
+    def __init__(self, engine, channel: str):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+
+    def _send(self, payload: str) -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def _listen(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        first = True
+        while not self._stopped.is_set():
+            try:
+                connection = psycopg2.connect(dsn)
+            except Exception:
+                logger.warning("Invalidation listener could not connect; retrying", exc_info=True)
+                self._stopped.wait(RECONNECT_SECONDS)
+                continue
+            try:
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                if not first:
+                    # Notifications sent while disconnected are lost
+                    self._handler("*", None)
+                first = False
+                while not self._stopped.is_set():
+                    if select.select([connection], [], [], RECONNECT_SECONDS) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self._receive(connection.notifies.pop(0).payload)
+            except Exception:
+                logger.warning("Invalidation listener lost its connection; reconnecting", exc_info=True)
+            finally:
+                connection.close()
+
+
+class LocalBus(InvalidationBus):
+    """UNIX datagram sockets in a shared directory, one per worker.
+
+    For tests and single-host runs without Postgres.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{os.getpid()}-{self.origin[:8]}.sock")
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+
+    def close(self) -> None:
+        super().close()
+        self._socket.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _send(self, payload: str) -> None:
+        data = payload.encode("utf-8")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if path == self.path or not name.endswith(".sock"):
+                    continue
+                try:
+                    sender.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Left behind by a worker that exited without closing
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                except OSError:
+                    logger.warning("Could not send invalidation to %s", path, exc_info=True)
+
+    def _listen(self) -> None:
+        self._socket.settimeout(1)
+        while not self._stopped.is_set():
+            try:
+                data = self._socket.recv(DATAGRAM_PAYLOAD_LIMIT * 2)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self._receive(data.decode("utf-8"))
+
+
+def create_bus(kind: Optional[str], engine, channel: str, directory: str) -> Optional[InvalidationBus]:
+    if not kind:
+        return None
+    if kind == "postgres":
+        return PostgresBus(engine, channel)
+    if kind == "local":
+        return LocalBus(directory)
+    raise ValueError(f"Unknown INVALIDATION_BUS {kind!r}; expected 'postgres' or 'local'")
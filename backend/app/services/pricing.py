@@ -0,0 +1,49 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Mapping, Sequence
+
+PAISE = Decimal("0.01")
+HUNDRED = Decimal(100)
+
+
+def to_decimal(value: float) -> Decimal:
+    # Go through str so 0.1 stays 0.1 instead of its binary expansion
+    return Decimal(str(value))
+
+
+def round_amount(value: Decimal) -> Decimal:
+    return value.quantize(PAISE, rounding=ROUND_HALF_UP)
+
+
+def tax_rates(taxes: Sequence) -> Dict[int, tuple]:
+    """Map taxCode to its (igst, cgst, sgst) percentages as Decimals."""
+    return {tax.taxCode: (to_decimal(tax.igst), to_decimal(tax.cgst), to_decimal(tax.sgst)) for tax in taxes}
+
+
+def compute_lines(lines: Sequence, line_tax_codes: Sequence[int], rates: Mapping[int, tuple]) -> dict:
+    """Price invoice lines in one pass.
+
+    ``line_tax_codes`` holds the resolved taxCode of each line. Every amount
+    is rounded half-up to the paisa per line, and totals are the sums of the
+    rounded line amounts so they always reconcile with the lines.
+    """
+    priced: List[dict] = []
+    totals = dict.fromkeys(("taxableValue", "igst", "cgst", "sgst", "taxAmount", "total"), Decimal(0))
+    for line, tax_code in zip(lines, line_tax_codes):
+        igst_rate, cgst_rate, sgst_rate = rates[tax_code]
+        taxable = round_amount(to_decimal(line.qty) * to_decimal(line.rate))
+        if line.interState:
+            igst, cgst, sgst = round_amount(taxable * igst_rate / HUNDRED), Decimal(0), Decimal(0)
+        else:
+            igst, cgst, sgst = Decimal(0), round_amount(taxable * cgst_rate / HUNDRED), round_amount(taxable * sgst_rate / HUNDRED)
+        amounts = {
+            "taxableValue": taxable, "igst": igst, "cgst": cgst, "sgst": sgst,
+            "taxAmount": igst + cgst + sgst, "total": taxable + igst + cgst + sgst,
+        }
+        for key, value in amounts.items():
+            totals[key] += value
+        priced.append({
+            "prodCode": line.prodCode, "qty": line.qty, "rate": line.rate,
+            "interState": line.interState, "taxCode": tax_code,
+            **{key: float(value) for key, value in amounts.items()},
+        })
+    return {"lines": priced, "totals": {key: float(value) for key, value in totals.items()}}
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import ProdMast
+
+# Rows fetched per round trip from the server-side cursor; also the size of
+# each chunk handed to the response, so memory stays flat for any table size
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [column.key for column in ProdMast.__table__.columns]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stream_rows(db: Session, is_active: Optional[bool]):
+    stmt = select(ProdMast.__table__).order_by(ProdMast.prodCode)
+    if is_active is not None:
+        stmt = stmt.where(ProdMast.isActive == is_active)
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+    return result.partitions()
+
+
+def iter_products_ndjson(db: Session, is_active: Optional[bool] = None) -> Iterator[str]:
+    for partition in _stream_rows(db, is_active):
+        yield "".join(
+            json.dumps(dict(row._mapping), default=_json_default, separators=(",", ":")) + "\n"
+            for row in partition
+        )
+
+
+def iter_products_csv(db: Session, is_active: Optional[bool] = None) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for partition in _stream_rows(db, is_active):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+            for row in partition
+        )
+        yield buffer.getvalue()
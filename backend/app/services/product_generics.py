@@ -0,0 +1,99 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import Session
+
+from app.models.models import GenericMast, ProdGeneric, ProdMast
+from app.services import catalog
+from app.services.sync import record_deletions
+
+# Ids per IN list when deleting mappings
+DELETE_CHUNK_SIZE = 1000
+
+
+def _check_references(db: Session, desired: Dict[int, Sequence]) -> None:
+    prod_codes = list(desired)
+    # Lock the products in a fixed order so concurrent replaces of the same
+    # product queue up instead of both inserting the same mapping
+    lock = select(ProdMast.prodCode).where(ProdMast.prodCode.in_(prod_codes)).order_by(ProdMast.prodCode).with_for_update()
+    found = set(db.execute(lock).scalars())
+    missing = [code for code in prod_codes if code not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(map(str, missing))}")
+
+    generic_codes = {entry.genericCode for entries in desired.values() for entry in entries}
+    known = set(db.execute(select(GenericMast.genericCode).where(GenericMast.genericCode.in_(generic_codes))).scalars()) if generic_codes else set()
+    unknown = sorted(generic_codes - known)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown generics: {', '.join(map(str, unknown))}")
+
+    for prod_code, entries in desired.items():
+        codes = [entry.genericCode for entry in entries]
+        if len(codes) != len(set(codes)):
+            raise HTTPException(status_code=400, detail=f"Product {prod_code} lists a generic more than once")
+
+
+def replace_compositions(db: Session, desired: Dict[int, Sequence], created_by: str) -> dict:
+    """Make each product's ProdGeneric rows match ``desired`` in the caller's transaction.
+
+    ``desired`` maps prodCode to its full list of (genericCode, genericStrength)
+    entries. Only the difference is written: one bulk DELETE, UPDATE and INSERT
+    each. Returns the counts and the products whose composition changed.
+    """
+    _check_references(db, desired)
+
+    existing: Dict[int, Dict[int, tuple]] = defaultdict(dict)
+    stmt = select(ProdGeneric.id, ProdGeneric.prodCode, ProdGeneric.genericCode, ProdGeneric.genericStrength).where(
+        ProdGeneric.prodCode.in_(list(desired))
+    )
+    for mapping_id, prod_code, generic_code, strength in db.execute(stmt):
+        existing[prod_code][generic_code] = (mapping_id, strength)
+
+    inserts: List[dict] = []
+    updates: List[dict] = []
+    deletes: List[int] = []
+    changed = set()
+    for prod_code, entries in desired.items():
+        current = existing.get(prod_code, {})
+        wanted = {entry.genericCode: entry.genericStrength for entry in entries}
+        for generic_code, (mapping_id, strength) in current.items():
+            if generic_code not in wanted:
+                deletes.append(mapping_id)
+                changed.add(prod_code)
+            elif wanted[generic_code] != strength:
+                updates.append({"id": mapping_id, "genericStrength": wanted[generic_code]})
+                changed.add(prod_code)
+        for generic_code, strength in wanted.items():
+            if generic_code not in current:
+                inserts.append({
+                    "prodCode": prod_code, "genericCode": generic_code,
+                    "genericStrength": strength, "createdBy": created_by,
+                })
+                changed.add(prod_code)
+
+    # Deletes first so a generic can be swapped out and back in within one call
+    for start in range(0, len(deletes), DELETE_CHUNK_SIZE):
+        chunk = deletes[start:start + DELETE_CHUNK_SIZE]
+        db.execute(delete(ProdGeneric).where(ProdGeneric.id.in_(chunk)).execution_options(synchronize_session=False))
+    try:
+        if updates:
+            db.execute(update(ProdGeneric), updates)
+        if inserts:
+            db.execute(insert(ProdGeneric), inserts)
+    except (IntegrityError, StaleDataError):
+        # Only reachable where FOR UPDATE is a no-op (SQLite)
+        raise HTTPException(status_code=409, detail="Composition was changed concurrently; retry the request")
+    record_deletions(db, ProdGeneric, deletes)
+    catalog.refresh_products(db, changed)
+
+    return {
+        "products": len(desired),
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "changed": sorted(changed),
+    }
@@ -0,0 +1,137 @@
+import csv
+import io
+from typing import Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, text, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.api.schemas import ProdCreate
+from app.models.models import ProdMast
+from app.services import catalog
+
+# Rows written per transaction
+BULK_CHUNK_SIZE = 500
+
+# Natural key used to decide between insert and update
+NATURAL_KEY = ("prodName", "mfrCode", "packing")
+
+# Postgres advisory lock key held by each import transaction
+IMPORT_LOCK_KEY = 0x50524F44
+
+
+def parse_csv(text: str) -> List[dict]:
+    reader = csv.DictReader(io.StringIO(text))
+    # Blank cells mean "not provided" so optional fields fall back to their defaults
+    return [{key: value for key, value in row.items() if value not in ("", None)} for row in reader]
+
+
+def _format_validation_error(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+def _natural_key(product: ProdCreate) -> Tuple:
+    return tuple(getattr(product, field) for field in NATURAL_KEY)
+
+
+def _existing_codes(db: Session, keys: List[Tuple]) -> Dict[Tuple, int]:
+    key_columns = [getattr(ProdMast, field) for field in NATURAL_KEY]
+    rows = db.query(ProdMast.prodCode, *key_columns).filter(tuple_(*key_columns).in_(keys)).all()
+    return {tuple(row[1:]): row.prodCode for row in rows}
+
+
+def _lock_imports(db: Session) -> None:
+    # The natural key is not unique in the database, so two imports looking
+    # up the same new product would both insert it; serialise them instead.
+    # The lock is released when the chunk's transaction ends.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": IMPORT_LOCK_KEY})
+
+
+def _write_chunk(db: Session, valid: Dict[Tuple, Tuple[int, ProdCreate]]) -> Tuple[int, int]:
+    _lock_imports(db)
+    existing = _existing_codes(db, list(valid))
+    inserts, updates = [], []
+    for key, (_, product) in valid.items():
+        if key in existing:
+            # Columns missing from the row keep their stored values
+            changes = product.dict(exclude_unset=True)
+            changes.pop("createdBy", None)
+            updates.append({"prodCode": existing[key], **changes})
+        else:
+            inserts.append(product.dict())
+
+    if inserts:
+        db.execute(insert(ProdMast), inserts)
+    if updates:
+        db.execute(update(ProdMast), updates)
+    # Inserted rows only get their codes from the database, so look the chunk up again
+    catalog.refresh_products(db, _existing_codes(db, list(valid)).values())
+    return len(inserts), len(updates)
+
+
+def _write_rows_individually(db: Session, valid: Dict[Tuple, Tuple[int, ProdCreate]], errors: List[dict]) -> Tuple[int, int]:
+    inserted = updated = 0
+    for key, entry in valid.items():
+        try:
+            with db.begin_nested():
+                row_inserted, row_updated = _write_chunk(db, {key: entry})
+        except SQLAlchemyError as exc:
+            errors.append({"row": entry[0], "errors": [str(getattr(exc, "orig", None) or exc)]})
+            continue
+        inserted += row_inserted
+        updated += row_updated
+    return inserted, updated
+
+
+def import_products(db: Session, rows: List[dict], chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """Validate and upsert ``rows`` on the product natural key, one transaction per chunk.
+
+    Rows matching an existing product update only the columns they provide.
+
+    Invalid rows, and rows repeating the natural key of an earlier row in the
+    same import, are reported and skipped. If a chunk fails in the database
+    it is retried row by row so only the offending rows are rejected.
+    """
+    inserted = updated = 0
+    errors: List[dict] = []
+    # Natural key -> index of the first row that carried it
+    seen: Dict[Tuple, int] = {}
+
+    for start in range(0, len(rows), chunk_size):
+        valid: Dict[Tuple, Tuple[int, ProdCreate]] = {}
+        for index, row in enumerate(rows[start:start + chunk_size], start=start):
+            if not isinstance(row, dict):
+                errors.append({"row": index, "errors": ["Row must be an object"]})
+                continue
+            try:
+                product = ProdCreate(**row)
+            except ValidationError as exc:
+                errors.append({"row": index, "errors": _format_validation_error(exc)})
+                continue
+            key = _natural_key(product)
+            if key in seen:
+                errors.append({"row": index, "errors": [f"Duplicate of row {seen[key]}: same {', '.join(NATURAL_KEY)}"]})
+                continue
+            seen[key] = index
+            valid[key] = (index, product)
+
+        if not valid:
+            continue
+
+        try:
+            chunk_inserted, chunk_updated = _write_chunk(db, valid)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            chunk_inserted, chunk_updated = _write_rows_individually(db, valid, errors)
+            db.commit()
+        inserted += chunk_inserted
+        updated += chunk_updated
+
+    errors.sort(key=lambda error: error["row"])
+    return {"inserted": inserted, "updated": updated, "failed": len(errors), "errors": errors}
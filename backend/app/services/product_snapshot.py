@@ -0,0 +1,220 @@
+import threading
+import time
+from array import array
+from collections import namedtuple
+from itertools import compress
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import ProdMast
+from app.services import events
+
+# Compact the columns once this share of their slots belongs to deleted products
+TOMBSTONE_RATIO = 0.25
+
+SnapshotRow = namedtuple("SnapshotRow", "prodCode prodName mrp salTaxCode purTaxCode schTypeCode isActive")
+
+_COLUMNS = (
+    ProdMast.prodCode, ProdMast.prodName, ProdMast.mrp, ProdMast.salTaxCode,
+    ProdMast.purTaxCode, ProdMast.schTypeCode, ProdMast.isActive,
+)
+
+
+class ProductSnapshot:
+    """The product fields POS lookup needs, held column by column.
+
+    Each field is one ``array`` (names are one list), so a product costs a
+    few dozen bytes instead of an ORM instance. Rows are kept in prodCode
+    order and a dict maps prodCode to row offset. Deleted products leave a
+    tombstone (prodCode 0) until enough pile up to compact.
+
+    Built on first use, patched from product change events and reloaded
+    whole once older than ``max_age_seconds``. It is a read model for
+    browsing; pricing reads tax codes from the database.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._expires = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._codes = array("i")
+        self._names: List[str] = []
+        self._mrp = array("d")
+        self._sal_tax = array("i")
+        self._pur_tax = array("i")
+        self._sch_type = array("i")
+        self._active = array("b")
+        # prodCode -> row offset of live rows
+        self._offsets: Dict[int, int] = {}
+        # Highest code holding a slot, live or tombstoned; appends must exceed it
+        self._max_code = 0
+        self._tombstones = 0
+
+    def _offset(self, prod_code: int) -> int:
+        return self._offsets.get(prod_code, -1)
+
+    def _load_rows(self, rows) -> None:
+        self._reset()
+        rows = sorted(rows, key=lambda row: row.prodCode)
+        self._codes = array("i", (row.prodCode for row in rows))
+        self._names = [row.prodName for row in rows]
+        self._mrp = array("d", (row.mrp for row in rows))
+        self._sal_tax = array("i", (row.salTaxCode for row in rows))
+        self._pur_tax = array("i", (row.purTaxCode for row in rows))
+        self._sch_type = array("i", (row.schTypeCode for row in rows))
+        self._active = array("b", (bool(row.isActive) for row in rows))
+        self._offsets = {prod_code: offset for offset, prod_code in enumerate(self._codes)}
+        self._max_code = self._codes[-1] if rows else 0
+
+    def _rows(self) -> List[SnapshotRow]:
+        return [self._row(offset) for offset, prod_code in enumerate(self._codes) if prod_code]
+
+    def _row(self, offset: int) -> SnapshotRow:
+        return SnapshotRow(
+            self._codes[offset], self._names[offset], self._mrp[offset], self._sal_tax[offset],
+            self._pur_tax[offset], self._sch_type[offset], bool(self._active[offset]),
+        )
+
+    def _put(self, row) -> None:
+        offset = self._offset(row.prodCode)
+        if offset < 0:
+            if row.prodCode < self._max_code:
+                # Out of order (an explicit, reused code); rebuild to keep prodCode order
+                self._load_rows(self._rows() + [row])
+                return
+            self._offsets[row.prodCode] = len(self._codes)
+            self._max_code = row.prodCode
+            self._codes.append(row.prodCode)
+            self._names.append(row.prodName)
+            self._mrp.append(row.mrp)
+            self._sal_tax.append(row.salTaxCode)
+            self._pur_tax.append(row.purTaxCode)
+            self._sch_type.append(row.schTypeCode)
+            self._active.append(bool(row.isActive))
+            return
+        self._names[offset] = row.prodName
+        self._mrp[offset] = row.mrp
+        self._sal_tax[offset] = row.salTaxCode
+        self._pur_tax[offset] = row.purTaxCode
+        self._sch_type[offset] = row.schTypeCode
+        self._active[offset] = bool(row.isActive)
+
+    def _delete(self, prod_code: int) -> None:
+        offset = self._offset(prod_code)
+        if offset < 0:
+            return
+        del self._offsets[prod_code]
+        self._codes[offset] = 0
+        self._names[offset] = ""
+        self._active[offset] = 0
+        self._tombstones += 1
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded and time.monotonic() < self._expires:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded and now < self._expires:
+                return
+            db = SessionLocal()
+            try:
+                rows = db.execute(select(*_COLUMNS)).all()
+            finally:
+                db.close()
+            self._load_rows(rows)
+            self._loaded = True
+            self._expires = now + self.max_age_seconds
+
+    def refresh(self, db: Session, prod_codes: Iterable[int]) -> None:
+        """Re-read ``prod_codes`` from ``db``; codes with no row are dropped."""
+        if not self._loaded:
+            return
+        prod_codes = list(prod_codes)
+        rows = db.execute(select(*_COLUMNS).where(ProdMast.prodCode.in_(prod_codes))).all()
+        with self._lock:
+            found = {row.prodCode for row in rows}
+            for prod_code in prod_codes:
+                if prod_code not in found:
+                    self._delete(prod_code)
+            for row in rows:
+                self._put(row)
+            if self._tombstones > TOMBSTONE_RATIO * len(self._codes):
+                self._load_rows(self._rows())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+            self._reset()
+
+    def get(self, prod_code: int) -> Optional[SnapshotRow]:
+        self._ensure_loaded()
+        with self._lock:
+            offset = self._offset(prod_code)
+            return self._row(offset) if offset >= 0 else None
+
+    def filter(
+        self,
+        active_only: bool = False,
+        sch_type_codes: Optional[Iterable[int]] = None,
+        sal_tax_codes: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        """prodCodes matching every given condition, in prodCode order.
+
+        Each condition is a selector mapped over a whole column in C
+        (array items, set membership), and ``compress`` applies them together.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            # Live rows have a non-zero code. Every selector yields a
+            # non-negative number, so min() across them is a logical AND.
+            selectors = [self._codes]
+            if active_only:
+                selectors.append(self._active)
+            if sch_type_codes is not None:
+                selectors.append(map(set(sch_type_codes).__contains__, self._sch_type))
+            if sal_tax_codes is not None:
+                selectors.append(map(set(sal_tax_codes).__contains__, self._sal_tax))
+            selector = selectors[0] if len(selectors) == 1 else map(min, *selectors)
+            return list(compress(self._codes, selector))
+
+    def rows(self, prod_codes: Iterable[int]) -> List[SnapshotRow]:
+        """Rows for the known products in ``prod_codes``, in the given order."""
+        self._ensure_loaded()
+        with self._lock:
+            offsets = (self._offset(prod_code) for prod_code in prod_codes)
+            return [self._row(offset) for offset in offsets if offset >= 0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            columns = (self._codes, self._mrp, self._sal_tax, self._pur_tax, self._sch_type, self._active)
+            return {
+                "loaded": int(self._loaded),
+                "products": len(self._codes) - self._tombstones,
+                "tombstones": self._tombstones,
+                "array_bytes": sum(column.itemsize * len(column) for column in columns),
+            }
+
+
+product_snapshot = ProductSnapshot(max_age_seconds=settings.PRODUCT_SNAPSHOT_MAX_AGE_SECONDS)
+
+
+def _refresh_products(prod_codes: Optional[List[int]]) -> None:
+    if prod_codes is None:
+        product_snapshot.invalidate()
+        return
+    db = SessionLocal()
+    try:
+        product_snapshot.refresh(db, prod_codes)
+    finally:
+        db.close()
+
+
+events.subscribe("product", _refresh_products)
@@ -0,0 +1,257 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import MfrMast, ProdMast
+from app.services import events
+
+# Upper bound on index entries walked per match stage, keeps short prefixes cheap
+MAX_SCAN = 20000
+# Minimum share of the query's trigrams a fuzzy match must contain
+MIN_TRIGRAM_SIMILARITY = 0.5
+# Postings read and candidates scored by the fuzzy stage
+FUZZY_SCAN_BUDGET = 5000
+FUZZY_CANDIDATES = 200
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+_Doc = namedtuple("_Doc", "prodCode prodName hsnCode mfrShortName mrp isActive name_key terms")
+
+
+def normalize(text: Optional[str]) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _scan_prefix(entries: List[Tuple[str, int]], prefix: str) -> Iterator[Tuple[str, int]]:
+    index = bisect_left(entries, (prefix, -1))
+    end = min(len(entries), index + MAX_SCAN)
+    while index < end and entries[index][0].startswith(prefix):
+        yield entries[index]
+        index += 1
+
+
+def _remove(entries: List[Tuple[str, int]], entry: Tuple[str, int]) -> None:
+    index = bisect_left(entries, entry)
+    if index < len(entries) and entries[index] == entry:
+        del entries[index]
+
+
+class ProductSearchIndex:
+    """In-memory autocomplete index over product name, HSN code and manufacturer short name.
+
+    Matches are ranked in stages: product name starting with the query, then
+    every query word prefixing a name word, HSN code or manufacturer short
+    name, then trigram similarity for misspellings. The index is built on
+    first use, patched from product and manufacturer change events and
+    reloaded whole once older than ``max_age_seconds``.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._expires = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._docs: Dict[int, _Doc] = {}
+        # Sorted (key, prodCode) lists searched by bisection
+        self._names: List[Tuple[str, int]] = []
+        self._terms: List[Tuple[str, int]] = []
+        self._trigram_postings: Dict[str, Set[int]] = {}
+
+    @staticmethod
+    def _select():
+        return (
+            select(
+                ProdMast.prodCode, ProdMast.prodName, ProdMast.hsnCode, ProdMast.mrp,
+                ProdMast.isActive, MfrMast.mfrShortName
+            )
+            .outerjoin(MfrMast, MfrMast.mfrCode == ProdMast.mfrCode)
+        )
+
+    @staticmethod
+    def _make_doc(row) -> _Doc:
+        name_key = normalize(row.prodName)
+        terms = tuple(dict.fromkeys(
+            name_key.split() + normalize(row.hsnCode).split() + normalize(row.mfrShortName).split()
+        ))
+        return _Doc(row.prodCode, row.prodName, row.hsnCode, row.mfrShortName, row.mrp, row.isActive, name_key, terms)
+
+    def _add(self, doc: _Doc, bulk: bool = False) -> None:
+        # Bulk loads append and sort once at the end instead of inserting in order
+        add = list.append if bulk else insort
+        self._docs[doc.prodCode] = doc
+        add(self._names, (doc.name_key, doc.prodCode))
+        for term in doc.terms:
+            add(self._terms, (term, doc.prodCode))
+        for gram in _trigrams(doc.name_key):
+            self._trigram_postings.setdefault(gram, set()).add(doc.prodCode)
+
+    def _discard(self, prod_code: int) -> None:
+        doc = self._docs.pop(prod_code, None)
+        if doc is None:
+            return
+        _remove(self._names, (doc.name_key, prod_code))
+        for term in doc.terms:
+            _remove(self._terms, (term, prod_code))
+        for gram in _trigrams(doc.name_key):
+            postings = self._trigram_postings.get(gram)
+            if postings is not None:
+                postings.discard(prod_code)
+                if not postings:
+                    del self._trigram_postings[gram]
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded and time.monotonic() < self._expires:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded and now < self._expires:
+                return
+            db = SessionLocal()
+            try:
+                rows = db.execute(self._select()).all()
+            finally:
+                db.close()
+            self._reset()
+            for row in rows:
+                self._add(self._make_doc(row), bulk=True)
+            self._names.sort()
+            self._terms.sort()
+            self._loaded = True
+            self._expires = now + self.max_age_seconds
+
+    def refresh(self, db: Session, prod_codes: Optional[Iterable[int]] = None, mfr_codes: Optional[Iterable[int]] = None) -> None:
+        """Re-read the given products (or all products of the given manufacturers) from ``db``."""
+        if not self._loaded:
+            return
+        stmt = self._select()
+        if prod_codes is not None:
+            prod_codes = list(prod_codes)
+            stmt = stmt.where(ProdMast.prodCode.in_(prod_codes))
+        if mfr_codes is not None:
+            stmt = stmt.where(ProdMast.mfrCode.in_(list(mfr_codes)))
+        rows = db.execute(stmt).all()
+        with self._lock:
+            stale = set(prod_codes) if prod_codes is not None else set()
+            stale.update(row.prodCode for row in rows)
+            for prod_code in stale:
+                self._discard(prod_code)
+            for row in rows:
+                self._add(self._make_doc(row))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+            self._reset()
+
+    def _matches_all(self, doc: _Doc, tokens: List[str]) -> bool:
+        return all(any(term.startswith(token) for term in doc.terms) for token in tokens)
+
+    def search(self, query: str, limit: int = 10, active_only: bool = True) -> List[_Doc]:
+        key = normalize(query)
+        if not key:
+            return []
+        self._ensure_loaded()
+        tokens = key.split()
+
+        with self._lock:
+            results: List[_Doc] = []
+            seen: Set[int] = set()
+
+            def take(prod_code: int) -> bool:
+                doc = self._docs[prod_code]
+                if prod_code not in seen and (doc.isActive or not active_only):
+                    seen.add(prod_code)
+                    results.append(doc)
+                return len(results) >= limit
+
+            for _, prod_code in _scan_prefix(self._names, key):
+                if take(prod_code):
+                    return results
+
+            for _, prod_code in _scan_prefix(self._terms, tokens[0]):
+                if prod_code not in seen and self._matches_all(self._docs[prod_code], tokens[1:]):
+                    if take(prod_code):
+                        return results
+
+            grams = _trigrams(key)
+            if len(key) < 3 or not grams:
+                return results
+            # Count shared trigrams over the rarest postings only; common grams
+            # ("tab", "500") are checked afterwards against the best candidates
+            postings = sorted(
+                ((gram, self._trigram_postings.get(gram, ())) for gram in grams), key=lambda item: len(item[1])
+            )
+            shared: Counter = Counter()
+            scanned = consulted = 0
+            for _, posting in postings:
+                if consulted and scanned + len(posting) > FUZZY_SCAN_BUDGET:
+                    break
+                scanned += len(posting)
+                consulted += 1
+                shared.update(posting)
+
+            skipped = [posting for _, posting in postings[consulted:]]
+            needed = MIN_TRIGRAM_SIMILARITY * len(grams)
+            # Drop candidates that cannot reach the threshold even if they hold every skipped gram
+            reachable = [item for item in shared.items() if item[1] + len(skipped) >= needed]
+            reachable.sort(key=lambda item: -item[1])
+            scored = []
+            for prod_code, count in reachable[:FUZZY_CANDIDATES]:
+                if prod_code in seen:
+                    continue
+                count += sum(1 for posting in skipped if prod_code in posting)
+                if count >= needed:
+                    scored.append((-count, self._docs[prod_code].name_key, prod_code))
+            for _, _, prod_code in sorted(scored):
+                if take(prod_code):
+                    break
+            return results
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"loaded": int(self._loaded), "products": len(self._docs), "terms": len(self._terms)}
+
+
+product_search_index = ProductSearchIndex(max_age_seconds=settings.SEARCH_INDEX_MAX_AGE_SECONDS)
+
+
+def _refresh_products(prod_codes: Optional[List[int]]) -> None:
+    if prod_codes is None:
+        product_search_index.invalidate()
+        return
+    db = SessionLocal()
+    try:
+        product_search_index.refresh(db, prod_codes=prod_codes)
+    finally:
+        db.close()
+
+
+def _refresh_manufacturers(mfr_codes: Optional[List[int]]) -> None:
+    if mfr_codes is None:
+        product_search_index.invalidate()
+        return
+    db = SessionLocal()
+    try:
+        product_search_index.refresh(db, mfr_codes=mfr_codes)
+    finally:
+        db.close()
+
+
+events.subscribe("product", _refresh_products)
+events.subscribe("manufacturer", _refresh_manufacturers)
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.api.pagination import decode_cursor, encode_cursor
+from app.models.models import (
+    DeletedRecord, GenericMast, MfrMast, ProdCatMast, ProdGeneric, ProdMast, ProdTypeMast, SchTypeMast, TaxMast
+)
+
+# Parents before children, so clients can apply changes in the order returned
+SYNC_MODELS = (TaxMast, ProdTypeMast, ProdCatMast, SchTypeMast, MfrMast, GenericMast, ProdMast, ProdGeneric)
+
+SYNC_BATCH_SIZE = 1000
+
+# Rows stamped less than this long ago are held back until the next sync.
+# A transaction's now() is its start time, so a slow writer can commit rows
+# stamped before a token that was already handed out; the window covers it.
+SYNC_SETTLE_SECONDS = 2
+
+
+def record_deletions(db: Session, model, ids: Iterable[int]) -> None:
+    """Add tombstones for deleted ``model`` rows to the caller's transaction."""
+    rows = [{"entity": model.__tablename__, "entityId": entity_id} for entity_id in ids]
+    if rows:
+        # One executemany rather than an ORM flush per tombstone
+        db.execute(insert(DeletedRecord), rows)
+
+
+def _sort_key(column, dialect: str):
+    if dialect == "sqlite":
+        # SQLite keeps datetimes as text, with or without a fraction depending on
+        # whether the value came from Python or from CURRENT_TIMESTAMP
+        return func.strftime("%Y-%m-%d %H:%M:%f", column)
+    return column
+
+
+def _bind_value(value: str, dialect: str):
+    return value if dialect == "sqlite" else datetime.fromisoformat(value)
+
+
+def _format_value(value, dialect: str) -> str:
+    if dialect == "sqlite":
+        return value if isinstance(value, str) else value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return value.isoformat()
+
+
+def _parse_position(position) -> Optional[List[Any]]:
+    if position is None:
+        return None
+    if (
+        not isinstance(position, list) or len(position) != 2
+        or not isinstance(position[0], str) or not isinstance(position[1], int)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    try:
+        datetime.fromisoformat(position[0])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return position
+
+
+def _read_after(db: Session, stmt, key, pk, position, cutoff: str, dialect: str, limit: int):
+    stmt = stmt.where(key <= _bind_value(cutoff, dialect))
+    if position is not None:
+        since = _bind_value(position[0], dialect)
+        stmt = stmt.where(or_(key > since, and_(key == since, pk > position[1])))
+    # One extra row tells whether the caller has to come back for more
+    return db.execute(stmt.order_by(key, pk).limit(limit + 1)).all()
+
+
+def changes_since(db: Session, token: Optional[str], limit: int = SYNC_BATCH_SIZE) -> dict:
+    """Rows created or modified, and rows deleted, after ``token``.
+
+    The token holds a (change time, primary key) position per table plus one
+    for the tombstones. An empty token means a full download.
+    """
+    dialect = db.get_bind().dialect.name
+    size = len(SYNC_MODELS) + 1
+    positions = [_parse_position(p) for p in decode_cursor(token, size)] if token else [None] * size
+
+    now = db.execute(select(func.now())).scalar()
+    cutoff = _format_value(now.replace(tzinfo=None) - timedelta(seconds=SYNC_SETTLE_SECONDS), dialect)
+
+    changes: Dict[str, List[dict]] = {}
+    next_positions: List[Optional[List[Any]]] = []
+    has_more = False
+    for model, position in zip(SYNC_MODELS, positions):
+        pk = list(model.__table__.primary_key.columns)[0]
+        key = _sort_key(func.coalesce(model.modifiedDate, model.createdDate), dialect)
+        stmt = select(model.__table__, key.label("_changed"))
+        rows = _read_after(db, stmt, key, pk, position, cutoff, dialect, limit)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            has_more = True
+        changes[model.__tablename__] = [
+            {name: value for name, value in row._mapping.items() if name != "_changed"} for row in rows
+        ]
+        next_positions.append(
+            [_format_value(rows[-1]._changed, dialect), getattr(rows[-1], pk.key)] if rows else position
+        )
+
+    key = _sort_key(DeletedRecord.deletedDate, dialect)
+    stmt = select(DeletedRecord.entity, DeletedRecord.entityId, DeletedRecord.deletedDate, DeletedRecord.id, key.label("_changed"))
+    rows = _read_after(db, stmt, key, DeletedRecord.id, positions[-1], cutoff, dialect, limit)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        has_more = True
+    deleted = [{"entity": row.entity, "id": row.entityId, "deletedDate": row.deletedDate} for row in rows]
+    next_positions.append([_format_value(rows[-1]._changed, dialect), rows[-1].id] if rows else positions[-1])
+
+    return {
+        "token": encode_cursor(next_positions),
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": deleted,
+    }
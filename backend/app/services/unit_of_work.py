@@ -0,0 +1,174 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.schemas import (
+    GenericCreate, GenericUpdate, MfrCreate, MfrUpdate, ProdCatCreate, ProdCatUpdate, ProdCreate,
+    ProdGenericCreate, ProdTypeCreate, ProdTypeUpdate, ProdUpdate, SchTypeCreate, TaxCreate, TaxUpdate
+)
+from app.models.models import GenericMast, MfrMast, ProdCatMast, ProdGeneric, ProdMast, ProdTypeMast, SchTypeMast, TaxMast
+from app.services import catalog, events
+from app.services.sync import record_deletions
+
+
+@dataclass(frozen=True)
+class _Entity:
+    model: Any
+    label: str
+    create: Optional[type] = None
+    update: Optional[type] = None
+    delete: bool = False
+    # Published with the changed ids after commit
+    event: Optional[str] = None
+
+
+# The operations each entity's own routes allow
+ENTITIES: Dict[str, _Entity] = {
+    "product": _Entity(ProdMast, "Product", ProdCreate, ProdUpdate, delete=True, event="product"),
+    "product_type": _Entity(ProdTypeMast, "Product type", ProdTypeCreate, ProdTypeUpdate, event="product_type"),
+    "product_category": _Entity(ProdCatMast, "Product category", ProdCatCreate, ProdCatUpdate, event="product_category"),
+    "manufacturer": _Entity(MfrMast, "Manufacturer", MfrCreate, MfrUpdate, event="manufacturer"),
+    "tax": _Entity(TaxMast, "Tax", TaxCreate, TaxUpdate, event="tax"),
+    "schedule_type": _Entity(SchTypeMast, "Schedule type", SchTypeCreate, event="schedule_type"),
+    "generic": _Entity(GenericMast, "Generic", GenericCreate, GenericUpdate, event="generic"),
+    # Composition events carry the product's code, not the mapping id
+    "product_generic": _Entity(ProdGeneric, "Product-generic mapping", ProdGenericCreate, delete=True, event="product_composition"),
+}
+
+# Catalog columns copied from these masters are refreshed in place on update
+_CATALOG_MASTERS = (ProdTypeMast, MfrMast, TaxMast, GenericMast)
+
+# Masters with their own search documents, refreshed on create as well
+_SEARCHED_MASTERS = (MfrMast, GenericMast)
+
+
+class _Effects:
+    """Derived state to refresh once the whole batch has been applied."""
+
+    def __init__(self):
+        self.changed: Dict[str, Set[int]] = defaultdict(set)
+        self.masters: List[Tuple[Any, int]] = []
+
+    def before_commit(self, db: Session) -> None:
+        # Products rewritten below are skipped by the master passes, so each
+        # catalog row and search document is written once per batch
+        prod_codes = self.changed["product"] | self.changed["product_composition"]
+        for model, code in dict.fromkeys(self.masters):
+            catalog.refresh_master(db, model, code, skip=prod_codes)
+        catalog.refresh_products(db, prod_codes)
+
+    def after_commit(self) -> None:
+        for event, ids in self.changed.items():
+            if ids:
+                events.publish(event, sorted(ids))
+
+
+def _fail(index: int, status_code: int, message: str):
+    raise HTTPException(status_code=status_code, detail=f"Operation {index}: {message}")
+
+
+def _resolve(value, refs: Dict[str, int], index: int):
+    # {"$ref": "name"} stands for the id created by the operation with that ref
+    if isinstance(value, dict) and set(value) == {"$ref"}:
+        name = value["$ref"]
+        if name not in refs:
+            _fail(index, 400, f"Unknown reference '{name}'")
+        return refs[name]
+    return value
+
+
+def _validate(schema, data: Dict[str, Any], index: int) -> BaseModel:
+    try:
+        return schema.model_validate(data)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=[
+            {**error, "loc": ["body", "operations", index, "data", *error["loc"]]}
+            for error in exc.errors(include_url=False, include_context=False)
+        ])
+
+
+def _pk(entity: _Entity):
+    return entity.model.__mapper__.primary_key[0]
+
+
+def _apply(db: Session, index: int, operation, entity: _Entity, refs: Dict[str, int], effects: _Effects) -> int:
+    model = entity.model
+    pk = _pk(entity)
+    if operation.op == "create":
+        if entity.create is None:
+            _fail(index, 400, f"{operation.entity} cannot be created")
+        data = {key: _resolve(value, refs, index) for key, value in operation.data.items()}
+        values = _validate(entity.create, data, index).dict()
+        if model is ProdGeneric:
+            existing = db.query(ProdGeneric.id).filter(
+                ProdGeneric.prodCode == values["prodCode"], ProdGeneric.genericCode == values["genericCode"]
+            ).first()
+            if existing:
+                _fail(index, 400, "This product-generic mapping already exists")
+        row = model(**values)
+        db.add(row)
+        db.flush()
+        row_id = getattr(row, pk.key)
+    else:
+        if operation.id is None:
+            _fail(index, 400, f"{operation.op} needs an id")
+        row_id = _resolve(operation.id, refs, index)
+        if not isinstance(row_id, int):
+            _fail(index, 400, "id must be an integer or a {\"$ref\": ...} object")
+        row = db.query(model).filter(pk == row_id).first()
+        if row is None:
+            _fail(index, 404, f"{entity.label} not found")
+        if operation.op == "update":
+            if entity.update is None:
+                _fail(index, 400, f"{operation.entity} cannot be updated")
+            data = {key: _resolve(value, refs, index) for key, value in operation.data.items()}
+            for field, value in _validate(entity.update, data, index).dict(exclude_unset=True).items():
+                setattr(row, field, value)
+            db.flush()
+        else:
+            if not entity.delete:
+                _fail(index, 400, f"{operation.entity} cannot be deleted")
+            db.delete(row)
+            db.flush()
+            record_deletions(db, model, [row_id])
+
+    if entity.event:
+        effects.changed[entity.event].add(row.prodCode if model is ProdGeneric else row_id)
+    if model in _CATALOG_MASTERS and (operation.op == "update" or model in _SEARCHED_MASTERS):
+        effects.masters.append((model, row_id))
+    return row_id
+
+
+def run_batch(db: Session, operations: Sequence) -> List[dict]:
+    """Apply ``operations`` in order in the caller's session and commit once.
+
+    Each operation is flushed so later ones can reference the ids it created;
+    the first failure raises and nothing is committed.
+    """
+    refs: Dict[str, int] = {}
+    effects = _Effects()
+    results = []
+    for index, operation in enumerate(operations):
+        entity = ENTITIES[operation.entity]
+        if operation.ref is not None:
+            if operation.op != "create":
+                _fail(index, 400, "Only create operations can declare a ref")
+            if operation.ref in refs:
+                _fail(index, 400, f"Reference '{operation.ref}' is declared twice")
+        try:
+            row_id = _apply(db, index, operation, entity, refs, effects)
+        except IntegrityError as exc:
+            _fail(index, 400, f"Constraint violated: {exc.orig}")
+        if operation.ref is not None:
+            refs[operation.ref] = row_id
+        results.append({"index": index, "op": operation.op, "entity": operation.entity, "id": row_id, "ref": operation.ref})
+
+    effects.before_commit(db)
+    db.commit()
+    effects.after_commit()
+    return results
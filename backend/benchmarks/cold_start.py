@@ -0,0 +1,106 @@
+"""Compare first-request latency after startup with and without the warmup phase.
+
+Usage (from backend/, against a database filled by benchmarks.datagen):
+
+    python -m benchmarks.cold_start --database-url sqlite:///bench.db
+
+Each mode runs in a fresh interpreter: the app is imported, its startup
+handlers run, then every path is requested once (cold) and again
+``--requests`` times (warm).
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+API = "/api/v1"
+
+PATHS = (
+    f"{API}/products?limit=100",
+    f"{API}/products?limit=100&expand=manufacturer,saleTax",
+    f"{API}/products?limit=100&cursor=",
+    f"{API}/products/1",
+    f"{API}/products/search?q=pa",
+    f"{API}/products/1/substitutes",
+    f"{API}/catalog?limit=100",
+    f"{API}/manufacturers?limit=100",
+    f"{API}/generics?limit=100",
+    f"{API}/taxes",
+)
+
+
+def _median(samples: List[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2]
+
+
+async def _measure(requests: int) -> dict:
+    import httpx
+
+    started = time.perf_counter()
+    from app.main import app
+    from app.core.warmup import startup_stats
+    await app.router.startup()
+    startup_seconds = time.perf_counter() - started
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for path in PATHS:
+            began = time.perf_counter()
+            (await client.get(path)).raise_for_status()
+            cold = time.perf_counter() - began
+            samples = []
+            for _ in range(requests):
+                began = time.perf_counter()
+                await client.get(path)
+                samples.append(time.perf_counter() - began)
+            results.append({"path": path, "cold_ms": round(cold * 1000, 2), "warm_ms": round(_median(samples) * 1000, 2)})
+    return {"startup_seconds": round(startup_seconds, 3), "startup": startup_stats, "paths": results}
+
+
+def _child(args) -> None:
+    print(json.dumps(asyncio.run(_measure(args.requests))))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start latency with and without warmup.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Defaults to $DATABASE_URL")
+    parser.add_argument("--requests", type=int, default=20, help="Warm requests per path")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child(args)
+        return
+    if not args.database_url:
+        raise SystemExit("--database-url or DATABASE_URL is required")
+
+    report = {}
+    for mode, enabled in (("no_warmup", "false"), ("warmup", "true")):
+        env = {**os.environ, "DATABASE_URL": args.database_url, "WARMUP_ENABLED": enabled}
+        env.setdefault("SECRET_KEY", "benchmark")
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cold_start", "--child", "--requests", str(args.requests)],
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+        report[mode] = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode}: startup {report[mode]['startup_seconds']:.3f} s", file=sys.stderr)
+
+    for cold, warm in zip(report["no_warmup"]["paths"], report["warmup"]["paths"]):
+        print(
+            f"{cold['path']:<55} first request {cold['cold_ms']:>8.2f} -> {warm['cold_ms']:>8.2f} ms  "
+            f"(steady {warm['warm_ms']:.2f} ms)",
+            file=sys.stderr
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Synthetic data generator for every table in app/models/models.py.
+
+Usage (from backend/):
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --products 100000
+    python -m benchmarks.datagen --database-url postgresql://localhost/pharma_bench \\
+        --products 1000000 --mappings-per-product 3 --recreate
+
+Rows get explicit primary keys (1..N) so foreign keys can be generated
+without reading anything back, and the same --seed always produces the
+same dataset.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+TAX_RATES = (0, 5, 12, 18, 28)
+PRODUCT_TYPES = (
+    ("Tablet", "TAB"), ("Capsule", "CAP"), ("Syrup", "SYP"), ("Injection", "INJ"),
+    ("Ointment", "OIN"), ("Drops", "DRP"), ("Powder", "PWD"), ("Inhaler", "INH"),
+    ("Gel", "GEL"), ("Suspension", "SUS"), ("Cream", "CRM"), ("Lotion", "LOT"),
+)
+SCHEDULES = ("G", "H", "H1", "X", "OTC")
+SYLLABLES = (
+    "pa", "ra", "ce", "ta", "mol", "do", "lo", "cro", "cin", "zi", "thro", "my", "cal", "pol",
+    "am", "oxy", "cil", "lin", "met", "for", "min", "pan", "to", "azo", "le", "ator", "va", "sta",
+    "tin", "lev", "o", "ce", "tri", "zine", "mon", "te", "lu", "kast", "ran", "ti", "dine", "flu",
+)
+UNITS = ("mg", "mcg", "g", "ml", "%", "IU")
+STRENGTHS = (1, 2, 2.5, 5, 10, 20, 25, 40, 50, 100, 125, 200, 250, 400, 500, 650, 1000)
+PACKINGS = ("10x10", "10x15", "1x10", "1x15", "1x30", "60ml", "100ml", "200ml", "1x1", "5g", "15g", "30g")
+STATES = ("Maharashtra", "Gujarat", "Tamil Nadu", "Karnataka", "Telangana", "Delhi", "West Bengal", "Punjab")
+
+
+def _name(rng: random.Random, parts: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(engine, args) -> dict:
+    from sqlalchemy import insert, text
+    from sqlalchemy.orm import Session
+    from app.models.models import (
+        GenericMast, MfrMast, ProdCatalog, ProdCatMast, ProdGeneric, ProdMast, ProdTypeMast, SchTypeMast, TaxMast
+    )
+    from app.services import catalog
+
+    rng = random.Random(args.seed)
+    base_date = datetime(2024, 1, 1)
+
+    def audit(index: int) -> dict:
+        created = base_date + timedelta(minutes=index)
+        # Roughly a fifth of the rows have been edited since creation
+        modified = created + timedelta(days=rng.randint(1, 300)) if rng.random() < 0.2 else None
+        return {"createdDate": created, "modifiedDate": modified, "createdBy": "datagen"}
+
+    def taxes():
+        for code, rate in enumerate(TAX_RATES, start=1):
+            yield {"taxCode": code, "taxDesc": f"GST {rate}%", "igst": rate, "cgst": rate / 2, "sgst": rate / 2, **audit(code)}
+
+    def product_types():
+        for code, (name, short) in enumerate(PRODUCT_TYPES, start=1):
+            yield {"prodTypeCode": code, "prodTypeName": name, "prodTypeShortName": short, **audit(code)}
+
+    def schedules():
+        for code, name in enumerate(SCHEDULES, start=1):
+            yield {"schTypeCode": code, "schTypeName": f"Schedule {name}", **audit(code)}
+
+    def categories():
+        for code in range(1, args.categories + 1):
+            yield {"prodCatCode": code, "prodCatName": f"{_name(rng, 3)} agents", **audit(code)}
+
+    def manufacturers():
+        for code in range(1, args.manufacturers + 1):
+            name = f"{_name(rng, 3)} {rng.choice(('Pharma', 'Labs', 'Healthcare', 'Remedies'))}"
+            yield {
+                "mfrCode": code, "mfrName": name[:50], "mfrShortName": name[:3].upper(),
+                "address": f"{rng.randint(1, 999)} Industrial Estate", "city": _name(rng, 2),
+                "state": rng.choice(STATES), "pin": str(rng.randint(100000, 999999)),
+                "cpName": _name(rng, 2), "cpPhone": str(rng.randint(6000000000, 9999999999)),
+                "email": f"sales{code}@example.com", **audit(code),
+            }
+
+    def generics():
+        for code in range(1, args.generics + 1):
+            yield {
+                "genericCode": code, "genericName": _name(rng, rng.randint(3, 5))[:50],
+                "prodCatCode": rng.randint(1, args.categories), **audit(code),
+            }
+
+    def products():
+        for code in range(1, args.products + 1):
+            tax = rng.randint(1, len(TAX_RATES))
+            active = rng.random() < 0.9
+            yield {
+                "prodCode": code,
+                "prodName": f"{_name(rng, rng.randint(2, 4))} {rng.choice(STRENGTHS)}"[:50],
+                "hsnCode": f"3004{rng.randint(1000, 9999)}",
+                "packing": rng.choice(PACKINGS), "purUnit": "STRIP", "salUnit": "TAB",
+                "prodTypeCode": rng.randint(1, len(PRODUCT_TYPES)),
+                "mfrCode": rng.randint(1, args.manufacturers),
+                "mrp": round(rng.uniform(5, 2000), 2),
+                "purTaxCode": tax, "salTaxCode": tax,
+                "schTypeCode": rng.randint(1, len(SCHEDULES)),
+                "isActive": active,
+                "inActiveFrom": None if active else base_date + timedelta(days=rng.randint(1, 600)),
+                **audit(code),
+            }
+
+    def mappings():
+        mapping_id = 0
+        for prod_code in range(1, args.products + 1):
+            # 1..(2 * average - 1) generics per product keeps the requested average
+            count = rng.randint(1, max(1, 2 * args.mappings_per_product - 1))
+            for generic_code in rng.sample(range(1, args.generics + 1), min(count, args.generics)):
+                mapping_id += 1
+                strength = f"{rng.choice(STRENGTHS)}{rng.choice(UNITS)}"
+                yield {
+                    "id": mapping_id, "prodCode": prod_code, "genericCode": generic_code,
+                    "genericStrength": strength, **audit(mapping_id),
+                }
+
+    tables = [
+        (TaxMast, taxes), (ProdTypeMast, product_types), (SchTypeMast, schedules),
+        (ProdCatMast, categories), (MfrMast, manufacturers), (GenericMast, generics),
+        (ProdMast, products), (ProdGeneric, mappings),
+    ]
+    counts = {}
+    for model, rows in tables:
+        started = time.perf_counter()
+        total = 0
+        for chunk in _chunks(rows(), args.batch_size):
+            with engine.begin() as conn:
+                conn.execute(insert(model), chunk)
+            total += len(chunk)
+        counts[model.__tablename__] = total
+        print(f"{model.__tablename__:<14} {total:>10} rows  {time.perf_counter() - started:7.1f}s", file=sys.stderr)
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        counts[ProdCatalog.__tablename__] = catalog.rebuild(session)
+        session.commit()
+    print(f"{ProdCatalog.__tablename__:<14} {counts[ProdCatalog.__tablename__]:>10} rows  {time.perf_counter() - started:7.1f}s", file=sys.stderr)
+
+    if engine.dialect.name == "postgresql":
+        # Explicit ids bypass the serial sequences, move them past the generated rows
+        with engine.begin() as conn:
+            for model, _ in tables:
+                table = model.__tablename__
+                pk = list(model.__table__.primary_key.columns)[0].name
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{pk}'), "
+                    f"COALESCE((SELECT MAX(\"{pk}\") FROM \"{table}\"), 1))"
+                ))
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fill the Pharma ERP schema with synthetic data.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Defaults to $DATABASE_URL")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--mappings-per-product", type=int, default=3, help="Average ProdGeneric rows per product")
+    parser.add_argument("--manufacturers", type=int, default=None, help="Defaults to products / 100")
+    parser.add_argument("--generics", type=int, default=None, help="Defaults to products / 50")
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--recreate", action="store_true", help="Drop and recreate all tables first")
+    return parser
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    args = build_parser().parse_args(argv)
+    args.manufacturers = args.manufacturers or max(10, args.products // 100)
+    args.generics = args.generics or max(20, args.products // 50)
+    return args
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if not args.database_url:
+        raise SystemExit("--database-url or DATABASE_URL is required")
+
+    # Settings are read at import time, so point the app at the target database first
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    from app.core.database import Base, engine
+    import app.models.models  # noqa: F401  (registers the tables)
+
+    if args.recreate:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    generate(engine, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""In-process API benchmark for the routes in app/api/routes/products.py.
+
+Usage (from backend/, against a database filled by benchmarks.datagen):
+
+    python -m benchmarks.run --database-url sqlite:///bench.db --output results.json
+    python -m benchmarks.run --database-url sqlite:///bench.db --compare results.json
+
+Requests go through httpx's ASGI transport, so no server or network is
+involved. Each scenario runs a fixed number of requests at a fixed
+concurrency and reports throughput, p50/p95/p99 latency and SQL statements
+per request. Results are written as JSON so runs can be compared between
+commits.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+API = "/api/v1"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Builds (path, json body or None) for one request
+    build: Callable[["Context"], tuple]
+    requests: Optional[int] = None
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Context:
+    rng: random.Random
+    max_ids: dict
+    created_products: List[int] = field(default_factory=list)
+    created_mappings: List[int] = field(default_factory=list)
+
+    def pick(self, table: str) -> int:
+        return self.rng.randint(1, max(1, self.max_ids[table]))
+
+
+def _product_body(ctx: Context) -> dict:
+    return {
+        "prodName": f"Bench {ctx.rng.randint(1, 10 ** 9)}", "hsnCode": "30049099", "packing": "10x10",
+        "purUnit": "STRIP", "salUnit": "TAB", "prodTypeCode": ctx.pick("ProdTypeMast"),
+        "mfrCode": ctx.pick("MfrMast"), "mrp": round(ctx.rng.uniform(5, 500), 2),
+        "purTaxCode": ctx.pick("TaxMast"), "salTaxCode": ctx.pick("TaxMast"),
+        "schTypeCode": ctx.pick("SchTypeMast"), "createdBy": "bench",
+    }
+
+
+def _composition(ctx: Context) -> List[dict]:
+    codes = {ctx.pick("GenericMast") for _ in range(ctx.rng.randint(1, 3))}
+    return [{"genericCode": code, "genericStrength": f"{ctx.rng.choice((5, 10, 250, 500))}mg"} for code in sorted(codes)]
+
+
+def _wizard_batch(ctx: Context) -> dict:
+    # A new manufacturer with ten products and their compositions in one request
+    operations = [{"op": "create", "entity": "manufacturer", "ref": "mfr", "data": {"mfrName": "Bench Labs", "mfrShortName": "BEN", "createdBy": "bench"}}]
+    for n in range(10):
+        operations.append({"op": "create", "entity": "product", "ref": f"p{n}", "data": {**_product_body(ctx), "mfrCode": {"$ref": "mfr"}}})
+        operations += [
+            {"op": "create", "entity": "product_generic", "data": {"prodCode": {"$ref": f"p{n}"}, **entry, "createdBy": "bench"}}
+            for entry in _composition(ctx)
+        ]
+    return {"operations": operations}
+
+
+def _pop(items: List[int], fallback: int) -> int:
+    return items.pop() if items else fallback
+
+
+def scenarios() -> List[Scenario]:
+    read = ["read"]
+    write = ["write"]
+    return [
+        # Products
+        Scenario("products.list", "GET", lambda c: (f"{API}/products?limit=100", None), tags=read),
+        Scenario("products.list.deep_offset", "GET", lambda c: (f"{API}/products?limit=100&skip={c.max_ids['ProdMast'] // 2}", None), tags=read),
+        Scenario("products.list.cursor", "GET", lambda c: (f"{API}/products?limit=100&cursor=", None), tags=read),
+        Scenario("products.list.expand", "GET", lambda c: (f"{API}/products?limit=100&expand=manufacturer,saleTax,generics", None), tags=read),
+        Scenario("products.get", "GET", lambda c: (f"{API}/products/{c.pick('ProdMast')}", None), tags=read),
+        Scenario("products.substitutes", "GET", lambda c: (f"{API}/products/{c.pick('ProdMast')}/substitutes", None), tags=read),
+        Scenario("products.search", "GET", lambda c: (f"{API}/products/search?q={c.rng.choice(('pa', 'cro', 'met', 'amoxy', 'lev'))}", None), tags=read),
+        Scenario("products.export", "GET", lambda c: (f"{API}/products/export?format=ndjson", None), requests=3, tags=read),
+        Scenario("products.batch", "GET", lambda c: (f"{API}/products:batch?ids={','.join(str(c.pick('ProdMast')) for _ in range(40))}", None), tags=read),
+        Scenario("products.batch.post", "POST", lambda c: (f"{API}/products:batch", {"ids": [c.pick("ProdMast") for _ in range(500)]}), requests=50, tags=read),
+        Scenario("products.fields", "GET", lambda c: (f"{API}/products?limit=1000&fields=prodCode,prodName,mrp,salTaxCode", None), tags=read),
+        Scenario("search.fulltext", "GET", lambda c: (f"{API}/search?q={c.rng.choice(('para', 'amox 500', 'lura', 'ranc 650', 'kast'))}", None), tags=read),
+        Scenario("pos.products", "GET", lambda c: (f"{API}/pos/products?limit=1000&skip={c.rng.randint(0, c.max_ids['ProdMast'] // 2)}", None), tags=read),
+        Scenario("pos.products.filtered", "GET", lambda c: (f"{API}/pos/products?sch_type_code={c.pick('SchTypeMast')}&tax_code={c.pick('TaxMast')}&limit=1000", None), tags=read),
+        Scenario("pos.products.get", "GET", lambda c: (f"{API}/pos/products/{c.pick('ProdMast')}", None), tags=read),
+        Scenario("catalog.list", "GET", lambda c: (f"{API}/catalog?limit=100", None), tags=read),
+        Scenario("sync.full", "GET", lambda c: (f"{API}/sync?limit=1000", None), requests=10, tags=read),
+        Scenario("pricing.compute", "POST", lambda c: (f"{API}/pricing/compute", {"lines": [
+            {"prodCode": c.pick("ProdMast"), "qty": c.rng.randint(1, 20), "rate": round(c.rng.uniform(5, 500), 2), "interState": c.rng.random() < 0.3}
+            for _ in range(1000)
+        ]}), requests=50, tags=read),
+        Scenario("products.create", "POST", lambda c: (f"{API}/products", _product_body(c)), tags=write),
+        Scenario("products.bulk", "POST", lambda c: (f"{API}/products/bulk", [_product_body(c) for _ in range(100)]), requests=20, tags=write),
+        Scenario("products.update", "PUT", lambda c: (f"{API}/products/{c.pick('ProdMast')}", {"mrp": round(c.rng.uniform(5, 500), 2)}), tags=write),
+        Scenario("products.delete", "DELETE", lambda c: (f"{API}/products/{_pop(c.created_products, 0)}", None), tags=write),
+        # Masters
+        Scenario("product_types.list", "GET", lambda c: (f"{API}/product-types", None), tags=read),
+        Scenario("product_types.get", "GET", lambda c: (f"{API}/product-types/{c.pick('ProdTypeMast')}", None), tags=read),
+        Scenario("product_types.create", "POST", lambda c: (f"{API}/product-types", {"prodTypeName": "Bench", "prodTypeShortName": "BEN", "createdBy": "bench"}), requests=20, tags=write),
+        Scenario("product_types.update", "PUT", lambda c: (f"{API}/product-types/{c.pick('ProdTypeMast')}", {"prodTypeShortName": "UPD"}), requests=20, tags=write),
+        Scenario("product_categories.list", "GET", lambda c: (f"{API}/product-categories", None), tags=read),
+        Scenario("product_categories.get", "GET", lambda c: (f"{API}/product-categories/{c.pick('ProdCatMast')}", None), tags=read),
+        Scenario("product_categories.create", "POST", lambda c: (f"{API}/product-categories", {"prodCatName": "Bench", "createdBy": "bench"}), requests=20, tags=write),
+        Scenario("product_categories.update", "PUT", lambda c: (f"{API}/product-categories/{c.pick('ProdCatMast')}", {"prodCatName": "Bench updated"}), requests=20, tags=write),
+        Scenario("manufacturers.list", "GET", lambda c: (f"{API}/manufacturers?limit=100", None), tags=read),
+        Scenario("manufacturers.batch", "GET", lambda c: (f"{API}/manufacturers:batch?ids={','.join(str(c.pick('MfrMast')) for _ in range(20))}", None), tags=read),
+        Scenario("manufacturers.get", "GET", lambda c: (f"{API}/manufacturers/{c.pick('MfrMast')}", None), tags=read),
+        Scenario("manufacturers.create", "POST", lambda c: (f"{API}/manufacturers", {"mfrName": "Bench Labs", "mfrShortName": "BEN", "createdBy": "bench"}), requests=20, tags=write),
+        Scenario("manufacturers.update", "PUT", lambda c: (f"{API}/manufacturers/{c.pick('MfrMast')}", {"city": "Pune"}), requests=20, tags=write),
+        Scenario("taxes.list", "GET", lambda c: (f"{API}/taxes", None), tags=read),
+        Scenario("taxes.get", "GET", lambda c: (f"{API}/taxes/{c.pick('TaxMast')}", None), tags=read),
+        Scenario("taxes.create", "POST", lambda c: (f"{API}/taxes", {"taxDesc": "Bench", "igst": 0, "cgst": 0, "sgst": 0, "createdBy": "bench"}), requests=20, tags=write),
+        Scenario("taxes.update", "PUT", lambda c: (f"{API}/taxes/{c.pick('TaxMast')}", {"taxDesc": "Bench updated"}), requests=20, tags=write),
+        Scenario("schedule_types.list", "GET", lambda c: (f"{API}/schedule-types", None), tags=read),
+        Scenario("schedule_types.get", "GET", lambda c: (f"{API}/schedule-types/{c.pick('SchTypeMast')}", None), tags=read),
+        Scenario("schedule_types.create", "POST", lambda c: (f"{API}/schedule-types", {"schTypeName": "Bench", "createdBy": "bench"}), requests=20, tags=write),
+        # Generics and mappings
+        Scenario("generics.list", "GET", lambda c: (f"{API}/generics?limit=100", None), tags=read),
+        Scenario("generics.list.category", "GET", lambda c: (f"{API}/generics?category_id={c.pick('ProdCatMast')}", None), tags=read),
+        Scenario("generics.batch", "GET", lambda c: (f"{API}/generics:batch?ids={','.join(str(c.pick('GenericMast')) for _ in range(20))}", None), tags=read),
+        Scenario("generics.get", "GET", lambda c: (f"{API}/generics/{c.pick('GenericMast')}", None), tags=read),
+        Scenario("generics.create", "POST", lambda c: (f"{API}/generics", {"genericName": "Benchamol", "prodCatCode": c.pick("ProdCatMast"), "createdBy": "bench"}), requests=20, tags=write),
+        Scenario("generics.update", "PUT", lambda c: (f"{API}/generics/{c.pick('GenericMast')}", {"genericName": "Benchamol"}), requests=20, tags=write),
+        Scenario("product_generics.list", "GET", lambda c: (f"{API}/product-generics?limit=100", None), tags=read),
+        Scenario("product_generics.by_product", "GET", lambda c: (f"{API}/product-generics?product_id={c.pick('ProdMast')}", None), tags=read),
+        Scenario("product_generics.by_generic", "GET", lambda c: (f"{API}/product-generics?generic_id={c.pick('GenericMast')}", None), tags=read),
+        Scenario("product_generics.create", "POST", lambda c: (f"{API}/product-generics", {"prodCode": _pop(c.created_products, c.pick("ProdMast")), "genericCode": c.pick("GenericMast"), "genericStrength": "500mg", "createdBy": "bench"}), requests=20, tags=write),
+        Scenario("product_generics.replace", "PUT", lambda c: (f"{API}/products/{c.pick('ProdMast')}/generics", {"generics": _composition(c), "createdBy": "bench"}), requests=50, tags=write),
+        Scenario("product_generics.replace_bulk", "PUT", lambda c: (f"{API}/product-generics:replace", {"products": [
+            {"prodCode": code, "generics": _composition(c)} for code in {c.pick("ProdMast") for _ in range(200)}
+        ], "createdBy": "bench"}), requests=10, tags=write),
+        Scenario("batch.wizard", "POST", lambda c: (f"{API}/batch", _wizard_batch(c)), requests=20, tags=write),
+        Scenario("product_generics.delete", "DELETE", lambda c: (f"{API}/product-generics/{_pop(c.created_mappings, 0)}", None), requests=20, tags=write),
+    ]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_scenario(client, scenario: Scenario, ctx: Context, total: int, concurrency: int, counter: dict) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = [total]
+
+    async def worker():
+        nonlocal errors
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            path, body = scenario.build(ctx)
+            started = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif scenario.name == "products.create":
+                ctx.created_products.append(response.json()["prodCode"])
+            elif scenario.name == "product_generics.create":
+                ctx.created_mappings.append(response.json()["id"])
+
+    counter["statements"] = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "name": scenario.name,
+        "method": scenario.method,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "queries_per_request": round(counter["statements"] / total, 2),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: dict, current: dict) -> None:
+    before = {result["name"]: result for result in previous["results"]}
+    print(f"{'scenario':<32} {'p50 ms':>16} {'p99 ms':>16} {'rps':>18} {'q/req':>12}")
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        print(
+            f"{result['name']:<32} "
+            f"{old['p50_ms']:>7.2f}->{result['p50_ms']:<7.2f} "
+            f"{old['p99_ms']:>7.2f}->{result['p99_ms']:<7.2f} "
+            f"{old['throughput_rps']:>8.1f}->{result['throughput_rps']:<8.1f} "
+            f"{old['queries_per_request']:>5.1f}->{result['queries_per_request']:<5.1f}"
+        )
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import event, func, select
+    from app.core.database import engine
+    from app.main import app
+    from app.models.models import (
+        GenericMast, MfrMast, ProdCatMast, ProdGeneric, ProdMast, ProdTypeMast, SchTypeMast, TaxMast
+    )
+
+    max_ids = {}
+    with engine.connect() as conn:
+        for model in (GenericMast, MfrMast, ProdCatMast, ProdGeneric, ProdMast, ProdTypeMast, SchTypeMast, TaxMast):
+            pk = list(model.__table__.primary_key.columns)[0]
+            max_ids[model.__tablename__] = conn.execute(select(func.max(pk))).scalar() or 0
+
+    counter = {"statements": 0}
+
+    def count_statement(*_):
+        counter["statements"] += 1
+
+    event.listen(engine, "after_cursor_execute", count_statement)
+
+    selected = [
+        scenario for scenario in scenarios()
+        if (not args.only or any(scenario.name.startswith(prefix) for prefix in args.only))
+        and (not args.tag or set(args.tag) & set(scenario.tags))
+    ]
+    ctx = Context(rng=random.Random(args.seed), max_ids=max_ids)
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for scenario in selected:
+            if args.warmup:
+                await run_scenario(client, scenario, ctx, min(args.warmup, scenario.requests or args.requests), args.concurrency, counter)
+            total = scenario.requests or args.requests
+            result = await run_scenario(client, scenario, ctx, total, args.concurrency, counter)
+            results.append(result)
+            print(
+                f"{result['name']:<32} {result['throughput_rps']:>9.1f} rps  p50 {result['p50_ms']:>8.2f}  "
+                f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+                f"{result['queries_per_request']:>6.1f} q/req  {result['errors']} err",
+                file=sys.stderr
+            )
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "row_counts": max_ids,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the Pharma ERP API in-process.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Defaults to $DATABASE_URL")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario unless the scenario sets its own")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests before each scenario")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", action="append", help="Run scenarios whose name starts with this prefix (repeatable)")
+    parser.add_argument("--tag", action="append", choices=("read", "write"), help="Run only read or write scenarios")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Print a comparison against an earlier results file")
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    if not args.database_url:
+        raise SystemExit("--database-url or DATABASE_URL is required")
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            compare(json.load(handle), report)
+
+
+if __name__ == "__main__":
+    main()
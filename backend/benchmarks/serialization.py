@@ -0,0 +1,102 @@
+"""Compare the default and FAST_JSON_RESPONSES paths of the large list endpoints.
+
+Usage (from backend/, against a database filled by benchmarks.datagen):
+
+    python -m benchmarks.serialization --database-url sqlite:///bench.db
+
+Each endpoint is requested with the fast path off and on; the two bodies must
+decode to the same JSON before any timing is reported.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+API = "/api/v1"
+
+ENDPOINTS = (
+    f"{API}/products?limit=1000",
+    f"{API}/products?limit=1000&expand=",
+    f"{API}/products?limit=1000&expand=manufacturer,saleTax",
+    f"{API}/products?limit=1000&cursor=",
+    f"{API}/manufacturers?limit=1000",
+    f"{API}/generics?limit=1000",
+)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+async def _time(client, path: str, requests: int) -> List[float]:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(args) -> List[dict]:
+    import httpx
+    from app.core.config import settings
+    from app.main import app
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for path in ENDPOINTS:
+            bodies = {}
+            timings = {}
+            for fast in (False, True):
+                settings.FAST_JSON_RESPONSES = fast
+                bodies[fast] = (await client.get(path)).json()
+                await _time(client, path, args.warmup)
+                timings[fast] = await _time(client, path, args.requests)
+            if bodies[False] != bodies[True]:
+                raise SystemExit(f"{path}: fast path returned a different body")
+
+            default_p50 = _percentile(timings[False], 50)
+            fast_p50 = _percentile(timings[True], 50)
+            result = {
+                "path": path,
+                "default_p50_ms": round(default_p50 * 1000, 3),
+                "fast_p50_ms": round(fast_p50 * 1000, 3),
+                "default_p99_ms": round(_percentile(timings[False], 99) * 1000, 3),
+                "fast_p99_ms": round(_percentile(timings[True], 99) * 1000, 3),
+                "speedup": round(default_p50 / fast_p50, 2),
+            }
+            results.append(result)
+            print(
+                f"{path:<60} default {result['default_p50_ms']:>8.2f} ms  "
+                f"fast {result['fast_p50_ms']:>8.2f} ms  x{result['speedup']:.2f}",
+                file=sys.stderr
+            )
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the orjson fast path of the list endpoints.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Defaults to $DATABASE_URL")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        raise SystemExit("--database-url or DATABASE_URL is required")
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
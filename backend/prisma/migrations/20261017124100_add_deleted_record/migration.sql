@@ -0,0 +1,9 @@
+-- CreateTable
+CREATE TABLE "DeletedRecord" (
+    "id" SERIAL NOT NULL,
+    "entity" VARCHAR(50) NOT NULL,
+    "entityId" INTEGER NOT NULL,
+    "deletedDate" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "DeletedRecord_pkey" PRIMARY KEY ("id")
+);
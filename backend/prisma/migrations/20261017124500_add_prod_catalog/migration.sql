@@ -0,0 +1,51 @@
+-- CreateTable
+CREATE TABLE "ProdCatalog" (
+    "prodCode" INTEGER NOT NULL,
+    "prodName" VARCHAR(50) NOT NULL,
+    "hsnCode" VARCHAR(15),
+    "packing" VARCHAR(50) NOT NULL,
+    "mrp" DOUBLE PRECISION NOT NULL,
+    "isActive" BOOLEAN NOT NULL,
+    "mfrCode" INTEGER NOT NULL,
+    "mfrName" VARCHAR(50) NOT NULL,
+    "mfrShortName" VARCHAR(3) NOT NULL,
+    "prodTypeCode" INTEGER NOT NULL,
+    "prodTypeName" VARCHAR(50) NOT NULL,
+    "schTypeCode" INTEGER NOT NULL,
+    "schTypeName" VARCHAR(50) NOT NULL,
+    "salTaxCode" INTEGER NOT NULL,
+    "saleTaxDesc" VARCHAR(50) NOT NULL,
+    "saleTaxRate" DOUBLE PRECISION NOT NULL,
+    "composition" VARCHAR(500),
+    "refreshedDate" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "ProdCatalog_pkey" PRIMARY KEY ("prodCode")
+);
+
+-- CreateIndex
+CREATE INDEX "ix_ProdCatalog_prodName" ON "ProdCatalog"("prodName");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdCatalog_mfrCode" ON "ProdCatalog"("mfrCode");
+
+-- Backfill existing products, as app.services.catalog.rebuild does
+INSERT INTO "ProdCatalog" (
+    "prodCode", "prodName", "hsnCode", "packing", "mrp", "isActive",
+    "mfrCode", "mfrName", "mfrShortName", "prodTypeCode", "prodTypeName",
+    "schTypeCode", "schTypeName", "salTaxCode", "saleTaxDesc", "saleTaxRate", "composition"
+)
+SELECT
+    p."prodCode", p."prodName", p."hsnCode", p."packing", p."mrp", p."isActive",
+    p."mfrCode", m."mfrName", m."mfrShortName", p."prodTypeCode", pt."prodTypeName",
+    p."schTypeCode", s."schTypeName", p."salTaxCode", t."taxDesc", t."igst",
+    (
+        SELECT LEFT(string_agg(g."genericName" || ' ' || pg."genericStrength", ' + ' ORDER BY pg."id"), 500)
+        FROM "ProdGeneric" pg
+        JOIN "GenericMast" g ON g."genericCode" = pg."genericCode"
+        WHERE pg."prodCode" = p."prodCode"
+    )
+FROM "ProdMast" p
+JOIN "MfrMast" m ON m."mfrCode" = p."mfrCode"
+JOIN "ProdTypeMast" pt ON pt."prodTypeCode" = p."prodTypeCode"
+JOIN "SchTypeMast" s ON s."schTypeCode" = p."schTypeCode"
+JOIN "TaxMast" t ON t."taxCode" = p."salTaxCode";
@@ -0,0 +1,31 @@
+-- CreateTable
+CREATE TABLE "SearchDoc" (
+    "id" SERIAL NOT NULL,
+    "entity" VARCHAR(20) NOT NULL,
+    "entityId" INTEGER NOT NULL,
+    "title" VARCHAR(100) NOT NULL,
+    "content" VARCHAR(600) NOT NULL,
+    "isActive" BOOLEAN NOT NULL,
+
+    CONSTRAINT "SearchDoc_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "_searchDoc_entity_uc" ON "SearchDoc"("entity", "entityId");
+
+-- Full-text index; the expression must match SEARCH_DOC_TSVECTOR in
+-- app/models/models.py for GET /search to use it
+CREATE INDEX "ix_SearchDoc_fts" ON "SearchDoc" USING GIN ((setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', content), 'B')));
+
+-- Backfill documents, as app.services.catalog.rebuild does
+INSERT INTO "SearchDoc" ("entity", "entityId", "title", "content", "isActive")
+SELECT 'manufacturer', "mfrCode", "mfrName", concat_ws(' ', NULLIF("mfrShortName", ''), NULLIF("city", '')), true
+FROM "MfrMast";
+
+INSERT INTO "SearchDoc" ("entity", "entityId", "title", "content", "isActive")
+SELECT 'generic', "genericCode", "genericName", '', true
+FROM "GenericMast";
+
+INSERT INTO "SearchDoc" ("entity", "entityId", "title", "content", "isActive")
+SELECT 'product', "prodCode", LEFT("prodName", 100), LEFT(concat_ws(' ', NULLIF("composition", ''), "mfrName"), 600), "isActive"
+FROM "ProdCatalog";
@@ -0,0 +1,45 @@
+-- Foreign keys: Postgres does not index the referencing side, so deleting
+-- or checking a master row would scan ProdMast
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_prodTypeCode" ON "ProdMast"("prodTypeCode");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_mfrCode" ON "ProdMast"("mfrCode");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_purTaxCode" ON "ProdMast"("purTaxCode");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_salTaxCode" ON "ProdMast"("salTaxCode");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_schTypeCode" ON "ProdMast"("schTypeCode");
+
+-- GET /products?is_active= in code order, and ?sort=prodName
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_isActive" ON "ProdMast"("isActive", "prodCode");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdMast_prodName" ON "ProdMast"("prodName", "prodCode");
+
+-- Active products by name, the usual listing. Prisma cannot express a partial
+-- index; the predicate matches the "isActive" = <bound value> filters the API issues
+CREATE INDEX "ix_ProdMast_active_prodName" ON "ProdMast"("prodName", "prodCode") WHERE "isActive" = true;
+
+-- GET /generics?category_id=; also the prodCatCode foreign key
+
+-- CreateIndex
+CREATE INDEX "ix_GenericMast_prodCatCode" ON "GenericMast"("prodCatCode", "genericCode");
+
+-- Lookups by generic; the (prodCode, genericCode) unique index serves lookups by product
+
+-- CreateIndex
+CREATE INDEX "ix_ProdGeneric_genericCode" ON "ProdGeneric"("genericCode", "prodCode");
+
+-- CreateIndex
+CREATE INDEX "ix_ProdCatalog_isActive" ON "ProdCatalog"("isActive", "prodCode");
+
+-- CreateIndex
+CREATE INDEX "ix_DeletedRecord_deletedDate" ON "DeletedRecord"("deletedDate", "id");
@@ -0,0 +1,11 @@
+-- CreateTable
+CREATE TABLE "TableVersion" (
+    "tableName" VARCHAR(50) NOT NULL,
+    "version" BIGINT NOT NULL DEFAULT 0,
+
+    CONSTRAINT "TableVersion_pkey" PRIMARY KEY ("tableName")
+);
+
+-- One counter per table whose ETag validators carry a version (app.models.models.VERSIONED_TABLES)
+INSERT INTO "TableVersion" ("tableName", "version") VALUES
+    ('ProdMast', 0), ('ProdGeneric', 0), ('GenericMast', 0), ('MfrMast', 0);
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when the app is imported, so point it at a scratch
+# database (with the async stack mounted) before anything imports it.
+# TEST_DATABASE_URL runs the suite against another, disposable database.
+_database_dir = tempfile.mkdtemp(prefix="pharma-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", f"sqlite:///{_database_dir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["ASYNC_DB_ENABLED"] = "true"
+os.environ["WARMUP_ENABLED"] = "false"
+os.environ.pop("INVALIDATION_BUS", None)
+os.environ.pop("READ_DATABASE_URL", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api.conditional import validator_cache  # noqa: E402
+from app.core.cache import master_cache  # noqa: E402
+from app.core.database import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import events  # noqa: E402
+from app.services.unit_of_work import ENTITIES  # noqa: E402
+
+API = "/api/v1"
+
+
+def reset_database() -> None:
+    """Recreate empty tables and drop everything the app derived from the old rows."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    master_cache.clear()
+    validator_cache.clear()
+    for event in {entity.event for entity in ENTITIES.values()}:
+        events.publish(event)
+
+
+@pytest.fixture(scope="session")
+def client():
+    reset_database()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def masters(client):
+    """One row of each master a product refers to, keyed by the product column."""
+    def create(path: str, body: dict) -> dict:
+        response = client.post(API + path, json={**body, "createdBy": "test"})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    tax = create("/taxes", {"taxDesc": "GST 12%", "igst": 12, "cgst": 6, "sgst": 6})
+    return {
+        "prodTypeCode": create("/product-types", {"prodTypeName": "Tablet", "prodTypeShortName": "TAB"})["prodTypeCode"],
+        "mfrCode": create("/manufacturers", {"mfrName": "Cipla", "mfrShortName": "CIP"})["mfrCode"],
+        "schTypeCode": create("/schedule-types", {"schTypeName": "H"})["schTypeCode"],
+        "purTaxCode": tax["taxCode"],
+        "salTaxCode": tax["taxCode"],
+    }
+
+
+@pytest.fixture
+def product(client, masters) -> int:
+    response = client.post(API + "/products", json={
+        "prodName": "Paracip 500", "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB",
+        "mrp": 30, "createdBy": "test", **masters,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["prodCode"]
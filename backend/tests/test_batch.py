@@ -0,0 +1,146 @@
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.models import DeletedRecord, GenericMast, MfrMast, ProdCatalog, ProdMast, SearchDoc
+from app.services import unit_of_work
+
+from tests.conftest import API
+
+
+def _batch(client, *operations: dict):
+    return client.post(API + "/batch", json={"operations": list(operations)})
+
+
+def _product_data(masters: dict, name: str, **fields) -> dict:
+    return {"prodName": name, "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB", "mrp": 20, "createdBy": "test", **masters, **fields}
+
+
+@pytest.fixture
+def refresh_calls(monkeypatch) -> list:
+    """Every prodCode set passed to catalog.refresh_products during the test."""
+    calls = []
+    refresh_products = unit_of_work.catalog.refresh_products
+
+    def record(db, prod_codes):
+        calls.append(set(prod_codes))
+        refresh_products(db, prod_codes)
+    monkeypatch.setattr(unit_of_work.catalog, "refresh_products", record)
+    return calls
+
+
+def test_refs_resolve_to_created_ids(client, masters, refresh_calls):
+    response = _batch(
+        client,
+        {"op": "create", "entity": "manufacturer", "ref": "mfr", "data": {"mfrName": "Batch Labs", "mfrShortName": "BL", "createdBy": "test"}},
+        {"op": "create", "entity": "generic", "ref": "generic", "data": {"genericName": "Batchamol", "createdBy": "test"}},
+        {"op": "create", "entity": "product", "ref": "product", "data": _product_data(masters, "Batch Tab", mfrCode={"$ref": "mfr"})},
+        {"op": "create", "entity": "product_generic", "data": {
+            "prodCode": {"$ref": "product"}, "genericCode": {"$ref": "generic"}, "genericStrength": "500 mg", "createdBy": "test",
+        }},
+        {"op": "update", "entity": "product", "id": {"$ref": "product"}, "data": {"mrp": 55}},
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    ids = {result["ref"]: result["id"] for result in results if result["ref"]}
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[4]["id"] == ids["product"]
+
+    with SessionLocal() as db:
+        product = db.get(ProdMast, ids["product"])
+        assert (product.mfrCode, product.mrp) == (ids["mfr"], 55)
+        (entry,) = db.query(ProdCatalog).filter(ProdCatalog.prodCode == ids["product"]).all()
+    assert (entry.mfrName, entry.mrp) == ("Batch Labs", 55)
+    assert "Batchamol" in entry.composition
+    # The catalog row is written once, after every operation has been applied
+    assert [code for call in refresh_calls for code in call] == [ids["product"]]
+
+
+def test_master_update_reaches_products_outside_the_batch(client, masters, product):
+    other = client.post(API + "/products", json=_product_data(masters, "Batch Bystander")).json()["prodCode"]
+    response = _batch(
+        client,
+        {"op": "update", "entity": "manufacturer", "id": masters["mfrCode"], "data": {"mfrName": "Cipla Renamed"}},
+        {"op": "update", "entity": "product", "id": product, "data": {"mrp": 31}},
+    )
+    assert response.status_code == 200, response.text
+
+    with SessionLocal() as db:
+        entries = {entry.prodCode: entry for entry in db.query(ProdCatalog).filter(ProdCatalog.prodCode.in_([product, other]))}
+        docs = dict(db.query(SearchDoc.entityId, SearchDoc.content).filter(
+            SearchDoc.entity == "product", SearchDoc.entityId.in_([product, other])
+        ).all())
+    assert {code: entry.mfrName for code, entry in entries.items()} == {product: "Cipla Renamed", other: "Cipla Renamed"}
+    assert entries[product].mrp == 31
+    assert all("Cipla Renamed" in content for content in docs.values()) and len(docs) == 2
+
+
+def test_failure_rolls_back_earlier_operations(client, masters):
+    response = _batch(
+        client,
+        {"op": "create", "entity": "manufacturer", "data": {"mfrName": "Batch Rollback", "mfrShortName": "BR", "createdBy": "test"}},
+        {"op": "create", "entity": "product", "data": _product_data(masters, "Batch Rollback Tab")},
+        {"op": "update", "entity": "product", "id": 999999, "data": {"mrp": 1}},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Operation 2: Product not found"
+    with SessionLocal() as db:
+        assert db.query(MfrMast).filter(MfrMast.mfrName == "Batch Rollback").count() == 0
+        assert db.query(ProdMast).filter(ProdMast.prodName == "Batch Rollback Tab").count() == 0
+
+
+@pytest.mark.parametrize("operations, detail", [
+    (
+        [{"op": "update", "entity": "product", "id": {"$ref": "missing"}, "data": {"mrp": 1}}],
+        "Operation 0: Unknown reference 'missing'",
+    ),
+    (
+        [
+            {"op": "create", "entity": "generic", "ref": "twice", "data": {"genericName": "Batch Once", "createdBy": "test"}},
+            {"op": "create", "entity": "generic", "ref": "twice", "data": {"genericName": "Batch Twice", "createdBy": "test"}},
+        ],
+        "Operation 1: Reference 'twice' is declared twice",
+    ),
+    (
+        [{"op": "delete", "entity": "product", "id": 1, "ref": "deleted"}],
+        "Operation 0: Only create operations can declare a ref",
+    ),
+    (
+        [{"op": "delete", "entity": "tax", "id": 1}],
+        "Operation 0: tax cannot be deleted",
+    ),
+], ids=["unknown ref", "duplicate ref", "ref on delete", "forbidden op"])
+def test_invalid_operations_are_400(client, operations, detail):
+    response = _batch(client, *operations)
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+    with SessionLocal() as db:
+        assert db.query(GenericMast).filter(GenericMast.genericName == "Batch Once").count() == 0
+
+
+def test_deletes_write_one_tombstone_each(client, masters, product, refresh_calls):
+    response = _batch(
+        client,
+        {"op": "update", "entity": "product", "id": product, "data": {"mrp": 40}},
+        {"op": "create", "entity": "product", "ref": "short-lived", "data": _product_data(masters, "Batch Short")},
+        {"op": "delete", "entity": "product", "id": product},
+        {"op": "delete", "entity": "product", "id": {"$ref": "short-lived"}},
+    )
+    assert response.status_code == 200, response.text
+    created = response.json()["results"][1]["id"]
+
+    with SessionLocal() as db:
+        for prod_code in (product, created):
+            assert db.query(DeletedRecord).filter_by(entity="ProdMast", entityId=prod_code).count() == 1
+            assert db.get(ProdMast, prod_code) is None
+            assert db.get(ProdCatalog, prod_code) is None
+    assert sorted(code for call in refresh_calls for code in call) == sorted([product, created])
+
+
+def test_validation_errors_point_at_the_operation(client):
+    response = _batch(
+        client,
+        {"op": "create", "entity": "generic", "data": {"genericName": "Batch Valid", "createdBy": "test"}},
+        {"op": "create", "entity": "generic", "data": {"createdBy": "test"}},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "operations", 1, "data", "genericName"]
@@ -0,0 +1,34 @@
+from app.core.database import SessionLocal
+from app.models.models import ProdGeneric
+from app.services.composition_index import CompositionIndex
+
+from tests.conftest import API
+
+
+def _product(client, masters, name: str) -> int:
+    response = client.post(API + "/products", json={
+        "prodName": name, "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB",
+        "mrp": 30, "createdBy": "test", **masters,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["prodCode"]
+
+
+def test_index_reloads_after_max_age(client, masters):
+    generic = client.post(API + "/generics", json={"genericName": "Cetirizine", "createdBy": "test"}).json()["genericCode"]
+    first, second = _product(client, masters, "Cetzine"), _product(client, masters, "Alerid")
+    response = client.post(API + "/product-generics", json={
+        "prodCode": first, "genericCode": generic, "genericStrength": "10 mg", "createdBy": "test",
+    })
+    assert response.status_code == 200, response.text
+
+    fresh = CompositionIndex(max_age_seconds=0)
+    held = CompositionIndex(max_age_seconds=60)
+    assert fresh.substitutes(first) == held.substitutes(first) == set()
+    # Map the second product the way another worker would: no event here
+    with SessionLocal() as db:
+        db.add(ProdGeneric(prodCode=second, genericCode=generic, genericStrength="10MG", createdBy="test"))
+        db.commit()
+
+    assert held.substitutes(first) == set()
+    assert fresh.substitutes(first) == {second}
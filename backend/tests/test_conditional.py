@@ -0,0 +1,34 @@
+import pytest
+
+from tests.conftest import API
+
+
+@pytest.mark.parametrize("path", ["/products/{product}", "/products?limit=100"], ids=["item", "list"])
+def test_update_changes_etag(client, product, path):
+    # Within one second of the create, so counts and timestamps alone would not change
+    path = path.format(product=product)
+    etag = client.get(API + path).headers["ETag"]
+    assert client.get(API + path, headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.put(f"{API}/products/{product}", json={"mrp": 77})
+    assert response.status_code == 200, response.text
+
+    response = client.get(API + path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    body = response.json()
+    item = body if isinstance(body, dict) and "prodCode" in body else next(
+        row for row in (body["items"] if isinstance(body, dict) else body) if row["prodCode"] == product
+    )
+    assert item["mrp"] == 77
+
+
+def test_master_update_changes_etag(client, masters):
+    etag = client.get(API + "/taxes").headers["ETag"]
+    response = client.put(f"{API}/taxes/{masters['salTaxCode']}", json={"igst": 18, "cgst": 9, "sgst": 9})
+    assert response.status_code == 200, response.text
+
+    response = client.get(API + "/taxes", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    tax = next(row for row in response.json() if row["taxCode"] == masters["salTaxCode"])
+    assert tax["igst"] == 18
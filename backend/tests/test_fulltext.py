@@ -0,0 +1,27 @@
+from tests.conftest import API
+
+
+def _search(client, **params) -> dict:
+    response = client.get(API + "/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_total_counts_every_hit_on_any_page(client, masters):
+    for number in range(3):
+        response = client.post(API + "/products", json={
+            "prodName": f"Zyloric {number}", "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB",
+            "mrp": 30, "createdBy": "test", **masters,
+        })
+        assert response.status_code == 200, response.text
+
+    pages = [_search(client, q="zyloric", entity="product", limit=2, skip=skip) for skip in (0, 2, 40)]
+    assert [page["total"] for page in pages] == [3, 3, 3]
+    assert [page["total_pages"] for page in pages] == [2, 2, 2]
+    assert [len(page["items"]) for page in pages] == [2, 1, 0]
+    assert len({item["id"] for page in pages for item in page["items"]}) == 3
+
+
+def test_no_match_is_an_empty_page(client):
+    body = _search(client, q="nosuchdrug")
+    assert (body["total"], body["total_pages"], body["items"]) == (0, 0, [])
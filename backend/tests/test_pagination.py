@@ -0,0 +1,74 @@
+import base64
+import json
+
+import pytest
+
+from tests.conftest import API
+
+
+def _cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.fixture
+def products(client, masters) -> list:
+    codes = []
+    for name in ("Cetzine", "Amoxil", "Benadryl", "Amoxil", "Dolo"):
+        response = client.post(API + "/products", json={
+            "prodName": name, "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB",
+            "mrp": 10, "createdBy": "test", **masters,
+        })
+        assert response.status_code == 200, response.text
+        codes.append(response.json()["prodCode"])
+    return codes
+
+
+def _walk(client, path: str, limit: int = 2) -> list:
+    items, cursor, pages = [], "", 0
+    while cursor is not None:
+        body = client.get(API + path, params={"limit": limit, "cursor": cursor}).json()
+        assert len(body["items"]) <= limit
+        items += body["items"]
+        cursor = body["next_cursor"]
+        pages += 1
+        assert pages < 1000, "cursor did not advance"
+    return items
+
+
+def test_cursor_pages_cover_every_row_once(client, products):
+    items = _walk(client, "/products")
+    codes = [item["prodCode"] for item in items]
+    assert codes == sorted(set(codes))
+    assert set(products) <= set(codes)
+
+
+def test_cursor_pages_by_name_break_ties_on_code(client, products):
+    items = _walk(client, "/products?sort=prodName")
+    keys = [(item["prodName"], item["prodCode"]) for item in items]
+    assert keys == sorted(set(keys))
+    assert set(products) <= {code for _, code in keys}
+
+
+@pytest.mark.parametrize("path, cursor", [
+    ("/products", "not base64!"),
+    ("/products", _cursor({"prodCode": 1})),
+    ("/products", _cursor([1, 2])),
+    ("/products", _cursor([None])),
+    ("/products", _cursor(["1"])),
+    ("/products", _cursor([True])),
+    ("/products", _cursor([1.5])),
+    ("/products", _cursor([2**40])),
+    ("/products?sort=prodName", _cursor([1, 1])),
+    ("/products?sort=prodName", _cursor(["Amoxil", None])),
+    ("/catalog", _cursor(["1"])),
+    ("/generics", _cursor([None])),
+    ("/taxes", _cursor(["x"])),
+], ids=[
+    "garbage", "object", "too long", "null", "string for int", "bool for int", "float for int",
+    "int out of range", "int for name", "null code", "catalog", "generics", "master",
+])
+def test_bad_cursor_is_400(client, path, cursor):
+    separator = "&" if "?" in path else "?"
+    response = client.get(f"{API}{path}{separator}limit=10&cursor={cursor}")
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,83 @@
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.models import ProdMast, TaxMast
+
+from tests.conftest import API
+
+
+def _price(client, lines: list, tax_type: str = "sale") -> dict:
+    response = client.post(API + "/pricing/compute", json={"taxType": tax_type, "lines": lines})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def gst5(client, product) -> int:
+    """A 5% sale tax on ``product``; its purchase tax stays the 12% master."""
+    tax = client.post(API + "/taxes", json={
+        "taxDesc": "GST 5%", "igst": 5, "cgst": 2.5, "sgst": 2.5, "createdBy": "test",
+    }).json()
+    response = client.put(f"{API}/products/{product}", json={"salTaxCode": tax["taxCode"]})
+    assert response.status_code == 200, response.text
+    return tax["taxCode"]
+
+
+def test_pricing_reads_tax_from_database(client, masters, product):
+    # Warm this worker's snapshot, then change the tax the way another worker would: no event here
+    assert client.get(f"{API}/pos/products/{product}").json()["salTaxCode"] == masters["salTaxCode"]
+    tax = client.post(API + "/taxes", json={
+        "taxDesc": "GST 18%", "igst": 18, "cgst": 9, "sgst": 9, "createdBy": "test",
+    }).json()
+    with SessionLocal() as db:
+        db.get(ProdMast, product).salTaxCode = tax["taxCode"]
+        db.commit()
+
+    assert _price(client, [{"prodCode": product, "qty": 1, "rate": 100}])["lines"][0]["taxCode"] == tax["taxCode"]
+
+
+def test_pricing_reads_rates_from_database(client, masters, product):
+    # Warm this worker's taxes cache, then change the rate the way another worker would
+    assert client.get(f"{API}/taxes/{masters['salTaxCode']}").json()["cgst"] == 6
+    with SessionLocal() as db:
+        tax = db.get(TaxMast, masters["salTaxCode"])
+        tax.igst, tax.cgst, tax.sgst = 18, 9, 9
+        db.commit()
+
+    line = _price(client, [{"prodCode": product, "qty": 1, "rate": 100}])["lines"][0]
+    assert (line["cgst"], line["sgst"], line["total"]) == (9, 9, 118)
+
+
+def test_amounts_round_half_up_per_line(client, product, gst5):
+    # 2.5% of 1.00 is 0.025: half-up gives 0.03 where half-even would give 0.02
+    lines = [{"prodCode": product, "qty": 1, "rate": 1}, {"prodCode": product, "qty": 1, "rate": 1}]
+    result = _price(client, lines)
+    for line in result["lines"]:
+        assert (line["taxableValue"], line["cgst"], line["sgst"], line["total"]) == (1, 0.03, 0.03, 1.06)
+    # Totals add the rounded lines, not the rounded sum of raw amounts (0.05)
+    assert (result["totals"]["cgst"], result["totals"]["taxAmount"], result["totals"]["total"]) == (0.06, 0.12, 2.12)
+
+    # The taxable value itself is rounded half-up: 0.125 -> 0.13
+    assert _price(client, [{"prodCode": product, "qty": 0.5, "rate": 0.25}])["lines"][0]["taxableValue"] == 0.13
+
+
+def test_inter_state_charges_igst_only(client, product, gst5):
+    intra, inter = _price(client, [
+        {"prodCode": product, "qty": 2, "rate": 50},
+        {"prodCode": product, "qty": 2, "rate": 50, "interState": True},
+    ])["lines"]
+    assert (intra["igst"], intra["cgst"], intra["sgst"]) == (0, 2.5, 2.5)
+    assert (inter["igst"], inter["cgst"], inter["sgst"]) == (5, 0, 0)
+    assert intra["total"] == inter["total"] == 105
+
+
+def test_purchase_uses_purchase_tax(client, masters, product, gst5):
+    line = _price(client, [{"prodCode": product, "qty": 1, "rate": 100}], tax_type="purchase")["lines"][0]
+    assert line["taxCode"] == masters["purTaxCode"]
+    assert line["taxAmount"] == 12
+
+
+def test_unknown_product_is_404(client):
+    response = client.post(API + "/pricing/compute", json={"lines": [{"prodCode": 999999, "qty": 1, "rate": 1}]})
+    assert response.status_code == 404
+    assert "999999" in response.json()["detail"]
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.database import SessionLocal, engine
+from app.models.models import ProdMast
+from app.services.product_import import import_products
+
+from tests.conftest import API
+
+
+@pytest.fixture
+def row(masters):
+    def make(name: str, **fields) -> dict:
+        return {"prodName": name, "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB", "createdBy": "test", **masters, **fields}
+    return make
+
+
+def _import(client, rows: list) -> dict:
+    response = client.post(API + "/products/bulk", json=rows)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _stored(name: str) -> list:
+    with SessionLocal() as db:
+        return db.query(ProdMast).filter(ProdMast.prodName == name).all()
+
+
+def test_invalid_rows_are_reported_and_skipped(client, row):
+    result = _import(client, [row("Import Valid"), {**row("Import Unnamed"), "prodName": None}, "not a row", row("Import Priced", mrp=-1)])
+    assert (result["inserted"], result["updated"], result["failed"]) == (1, 0, 3)
+    assert [error["row"] for error in result["errors"]] == [1, 2, 3]
+    assert result["errors"][1]["errors"] == ["Row must be an object"]
+    assert len(_stored("Import Valid")) == 1
+
+
+def test_existing_product_keeps_columns_the_row_omits(client, row):
+    _import(client, [row("Import Update", hsnCode="3004", mrp=10)])
+    result = _import(client, [row("Import Update", mrp=12)])
+    assert (result["inserted"], result["updated"]) == (0, 1)
+    (product,) = _stored("Import Update")
+    assert (product.mrp, product.hsnCode) == (12, "3004")
+
+
+@pytest.mark.parametrize("chunk_size", [500, 1], ids=["same chunk", "across chunks"])
+def test_repeated_natural_key_is_reported(client, row, chunk_size):
+    name = f"Import Twice {chunk_size}"
+    with SessionLocal() as db:
+        result = import_products(db, [row(name, mrp=10), row(f"Import Other {chunk_size}"), row(name, mrp=99)], chunk_size=chunk_size)
+    assert (result["inserted"], result["failed"]) == (2, 1)
+    assert result["errors"] == [{"row": 2, "errors": ["Duplicate of row 0: same prodName, mfrCode, packing"]}]
+    assert [product.mrp for product in _stored(name)] == [10]
+
+
+@pytest.fixture
+def reject_trigger():
+    if engine.dialect.name != "sqlite":
+        pytest.skip("the failing row is made with a SQLite trigger")
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TRIGGER "reject_import" BEFORE INSERT ON "ProdMast" WHEN NEW."prodName" = \'Import Rejected\' '
+            "BEGIN SELECT RAISE(ABORT, 'rejected by trigger'); END"
+        ))
+    yield
+    with engine.begin() as conn:
+        conn.execute(text('DROP TRIGGER "reject_import"'))
+
+
+def test_failing_chunk_is_retried_row_by_row(client, row, reject_trigger):
+    result = _import(client, [row("Import Before"), row("Import Rejected"), row("Import After")])
+    assert (result["inserted"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["row"] == 1
+    assert "rejected by trigger" in result["errors"][0]["errors"][0]
+    assert _stored("Import Before") and _stored("Import After") and not _stored("Import Rejected")
+
+
+def _csv(masters, *rows: str) -> bytes:
+    header = "prodName,packing,purUnit,salUnit,mrp,createdBy," + ",".join(masters)
+    codes = ",".join(str(code) for code in masters.values())
+    return "\n".join([header, *(f"{line},{codes}" for line in rows)]).encode("utf-8")
+
+
+def test_csv_body(client, masters):
+    body = _csv(masters, "Import Csv,10x10,STRIP,TAB,5,test", "Import Csv Bad,10x10,STRIP,TAB,cheap,test")
+    response = client.post(API + "/products/bulk", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["inserted"], result["failed"]) == (1, 1)
+    assert result["errors"][0]["row"] == 1 and result["errors"][0]["errors"][0].startswith("mrp:")
+
+
+def test_multipart_upload(client, masters):
+    body = _csv(masters, "Import Upload,10x10,STRIP,TAB,,test")
+    response = client.post(API + "/products/bulk", files={"file": ("products.csv", body, "text/csv")})
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 1
+    # A blank cell falls back to the default
+    assert _stored("Import Upload")[0].mrp == 0
+
+
+def test_non_utf8_csv_is_400(client, masters):
+    body = _csv(masters, "Import Café,10x10,STRIP,TAB,5,test").decode("utf-8").encode("latin-1")
+    response = client.post(API + "/products/bulk", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CSV must be UTF-8 encoded"
@@ -0,0 +1,54 @@
+from sqlalchemy.orm import make_transient
+
+from app.core.database import SessionLocal
+from app.models.models import ProdMast
+from app.services.product_snapshot import ProductSnapshot
+
+from tests.conftest import API
+
+
+def _create_products(client, masters, count: int) -> list:
+    codes = []
+    for number in range(count):
+        response = client.post(API + "/products", json={
+            "prodName": f"Snapshot {number}", "packing": "10x10", "purUnit": "STRIP", "salUnit": "TAB",
+            "mrp": 30, "createdBy": "test", **masters,
+        })
+        assert response.status_code == 200, response.text
+        codes.append(response.json()["prodCode"])
+    return codes
+
+
+def test_reused_code_after_deleting_the_last_row_keeps_order(client, masters):
+    codes = _create_products(client, masters, 10)
+    snapshot = ProductSnapshot(max_age_seconds=60)
+    assert snapshot.filter()[-10:] == codes
+
+    with SessionLocal() as db:
+        reused = db.get(ProdMast, codes[4])
+        db.expunge(reused)
+    make_transient(reused)
+    for prod_code in (codes[4], codes[-1]):
+        assert client.delete(f"{API}/products/{prod_code}").status_code == 200
+    with SessionLocal() as db:
+        # The last slot is now a tombstone
+        snapshot.refresh(db, [codes[4], codes[-1]])
+        db.add(reused)
+        db.commit()
+        snapshot.refresh(db, [codes[4]])
+
+    assert snapshot.filter()[-9:] == codes[:-1]
+    assert snapshot.get(codes[4]).prodName == "Snapshot 4"
+    assert snapshot.get(codes[-1]) is None
+
+
+def test_snapshot_reloads_after_max_age(client, product):
+    fresh = ProductSnapshot(max_age_seconds=0)
+    held = ProductSnapshot(max_age_seconds=60)
+    assert fresh.get(product).mrp == held.get(product).mrp == 30
+    with SessionLocal() as db:
+        db.get(ProdMast, product).mrp = 45
+        db.commit()
+
+    assert held.get(product).mrp == 30
+    assert fresh.get(product).mrp == 45
@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.models import DeletedRecord, ProdMast
+from app.services import sync
+
+from tests.conftest import API
+
+
+def test_delete_records_tombstone(client, product):
+    response = client.delete(f"{API}/async/products/{product}")
+    assert response.status_code == 200
+
+    with SessionLocal() as db:
+        assert db.get(ProdMast, product) is None
+        tombstones = db.query(DeletedRecord).filter_by(entity="ProdMast", entityId=product).all()
+    assert len(tombstones) == 1
+
+
+def test_deleted_product_reaches_sync_clients(client, product, monkeypatch):
+    # Sync holds back rows stamped within the settle window; this one is brand new
+    monkeypatch.setattr(sync, "SYNC_SETTLE_SECONDS", 0)
+    client.delete(f"{API}/async/products/{product}")
+
+    # One row per table and page, so the download only completes by following the token
+    deleted = []
+    token = None
+    for _ in range(1000):
+        params = {"limit": 1, **({"since": token} if token else {})}
+        body = client.get(f"{API}/sync", params=params).json()
+        deleted += body["deleted"]
+        token = body["token"]
+        if not body["has_more"]:
+            break
+    else:
+        pytest.fail("sync never reported has_more = false")
+    assert {"entity": "ProdMast", "id": product} in [
+        {"entity": tombstone["entity"], "id": tombstone["id"]} for tombstone in deleted
+    ]
@@ -0,0 +1,164 @@
+"""List endpoints must not fall back to a sequential scan.
+
+Each case is requested while its SQL is recorded, then every recorded
+statement that filters or sorts (has WHERE or ORDER BY) is run again under
+EXPLAIN. It fails when it scans a table that grows with the catalog:
+"SCAN <table>" without an index on SQLite, "Seq Scan" on Postgres.
+Unfiltered, unsorted statements (whole master tables for the caches, ETag
+aggregates over a whole table, offset pages in storage order) read in
+storage order by design and are not checked; the TableVersion lookup an
+ETag aggregate carries does not count as filtering it. Cursor cases also fetch
+their second page, whose keyset predicate is what the sort indexes serve.
+
+The data comes from benchmarks.datagen, EXPLAIN_PRODUCTS products (2000 by
+default), and is ANALYZEd so the planner sees a realistic distribution.
+Much smaller catalogs are not meaningful here: with a few hundred products
+a 100-row page covers much of ProdGeneric and SQLite rightly scans it.
+Postgres prefers a sequential scan over an index matching most of a small
+table, so its plans are taken with enable_seqscan off: a Seq Scan then
+means no index can serve the query at all. GET /sync is not covered; it
+orders by a computed change time that plain column indexes cannot serve.
+"""
+import json
+import os
+import re
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import event, func, select, text
+from sqlalchemy.engine import Engine
+
+from app.api.conditional import validator_cache
+from app.core.database import engine
+from app.models.models import GenericMast, ProdGeneric, ProdMast
+from benchmarks import datagen
+from tests.conftest import API, reset_database
+
+PRODUCTS = int(os.environ.get("EXPLAIN_PRODUCTS", "2000"))
+
+# Tables whose size grows with the catalog; small masters are read whole and cached
+CHECKED_TABLES = {"ProdMast", "ProdGeneric", "ProdCatalog", "GenericMast", "MfrMast", "SearchDoc", "DeletedRecord"}
+
+# (name, path); {product}, {generic}, {category} and {mfr} are filled from the data
+CASES = (
+    ("products active", "/products?is_active=true&limit=100"),
+    ("products inactive", "/products?is_active=false&limit=100"),
+    ("products active cursor", "/products?is_active=true&limit=100&cursor="),
+    ("products inactive cursor", "/products?is_active=false&limit=100&cursor="),
+    ("products by name", "/products?limit=100&cursor=&sort=prodName"),
+    ("products active by name", "/products?is_active=true&limit=100&cursor=&sort=prodName"),
+    ("products active expanded", "/products?is_active=true&limit=100&cursor=&expand=manufacturer,saleTax,generics"),
+    ("products active fields", "/products?is_active=true&limit=100&cursor=&sort=prodName&fields=prodCode,prodName,mrp"),
+    ("product substitutes", "/products/{product}/substitutes"),
+    ("catalog active", "/catalog?is_active=true&limit=100"),
+    ("catalog inactive cursor", "/catalog?is_active=false&limit=100&cursor="),
+    ("catalog by manufacturer", "/catalog?mfr_code={mfr}&limit=100"),
+    ("catalog by manufacturer cursor", "/catalog?mfr_code={mfr}&limit=100&cursor="),
+    ("catalog by name", "/catalog?limit=100&cursor=&sort=prodName"),
+    ("generics by category", "/generics?category_id={category}&limit=100"),
+    ("generics by category cursor", "/generics?category_id={category}&limit=100&cursor="),
+    ("product-generics by product", "/product-generics?product_id={product}"),
+    ("product-generics by generic", "/product-generics?generic_id={generic}&limit=100"),
+    ("product-generics by generic cursor", "/product-generics?generic_id={generic}&limit=100&cursor="),
+    ("search", "/search?q=para&limit=20"),
+    ("search products", "/search?q=am&entity=product&limit=20"),
+)
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?"?(\w+)"?$')
+_FILTERED = re.compile(r"\s(WHERE|ORDER BY)\s")
+_VERSION_SUBQUERY = re.compile(r'\(SELECT "TableVersion"\.version FROM "TableVersion" WHERE [^)]*\)')
+
+
+@pytest.fixture(scope="module")
+def sample_ids(client):
+    reset_database()
+    datagen.generate(engine, datagen.parse_args(["--products", str(PRODUCTS)]))
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+        # The most widely used generic and a product that has it
+        generic = conn.execute(
+            select(ProdGeneric.genericCode).group_by(ProdGeneric.genericCode).order_by(func.count().desc()).limit(1)
+        ).scalar()
+        product = conn.execute(select(ProdGeneric.prodCode).where(ProdGeneric.genericCode == generic).limit(1)).scalar()
+        category = conn.execute(select(GenericMast.prodCatCode).where(GenericMast.prodCatCode.isnot(None)).limit(1)).scalar()
+        mfr = conn.execute(select(ProdMast.mfrCode).limit(1)).scalar()
+    yield {"product": product, "generic": generic, "category": category, "mfr": mfr}
+    reset_database()
+
+
+def _record_statements(client, path: str) -> List[Tuple[str, object]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")) and not executemany:
+            statements.append((statement, parameters))
+
+    # Cached ETag validators would hide their aggregate queries from every case but the first
+    validator_cache.clear()
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = client.get(API + path)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        # The second cursor page carries the keyset predicate
+        if isinstance(body, dict) and body.get("next_cursor"):
+            response = client.get(f"{API}{path.replace('&cursor=', '')}&cursor={body['next_cursor']}")
+            assert response.status_code == 200, response.text
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    return statements
+
+
+def _sqlite_plan(conn, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    problems = []
+    for detail in plan:
+        scanned = _SQLITE_SCAN.match(detail)
+        if scanned and scanned.group(1) in CHECKED_TABLES:
+            problems.append(detail)
+    return plan, problems
+
+
+def _postgres_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _postgres_nodes(child)
+
+
+def _postgres_plan(conn, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    (result,) = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(result, str):
+        result = json.loads(result)[0]
+    plan, problems = [], []
+    for node in _postgres_nodes(result["Plan"]):
+        line = f"{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}".strip()
+        plan.append(line)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES:
+            problems.append(line)
+    return plan, problems
+
+
+@pytest.mark.parametrize("template", [path for _, path in CASES], ids=[name for name, _ in CASES])
+def test_list_query_uses_indexes(client, sample_ids, template):
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        pytest.skip(f"EXPLAIN checks support SQLite and PostgreSQL, not {dialect}")
+    explain = _sqlite_plan if dialect == "sqlite" else _postgres_plan
+
+    statements = {
+        statement: parameters
+        for statement, parameters in _record_statements(client, template.format(**sample_ids))
+        if _FILTERED.search(_VERSION_SUBQUERY.sub("", " ".join(statement.split())))
+    }
+    assert statements, "the request ran no filtered or sorted statement"
+
+    failures = []
+    with engine.connect() as conn:
+        if dialect == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        for statement, parameters in statements.items():
+            plan, problems = explain(conn, statement, parameters)
+            if problems:
+                failures.append(f"{' '.join(statement.split())}\n  plan: {' | '.join(plan)}")
+    assert not failures, "sequential scans:\n" + "\n".join(failures)
@@ -0,0 +1,17 @@
+from app.core.database import SessionLocal
+from app.models.models import ProdMast
+from app.services.search_index import ProductSearchIndex
+
+
+def test_index_reloads_after_max_age(client, product):
+    fresh = ProductSearchIndex(max_age_seconds=0)
+    held = ProductSearchIndex(max_age_seconds=60)
+    assert fresh.search("paracip") and held.search("paracip")
+    assert not fresh.search("calpol")
+    # Rename the product the way another worker would: no event here
+    with SessionLocal() as db:
+        db.get(ProdMast, product).prodName = "Calpol 500"
+        db.commit()
+
+    assert product not in {doc.prodCode for doc in held.search("calpol")}
+    assert product in {doc.prodCode for doc in fresh.search("calpol")}